@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Cold-start benchmark of the pydev command line.
+
+Every command is run in a fresh interpreter from the root of the source tree and the median wall time together
+with the number of imported modules is printed. Source trees can be compared by passing more "--tree" options, for example:
+
+    git worktree add /tmp/pydev-baseline <ref>
+    python benchmarks/cold_start.py --tree baseline=/tmp/pydev-baseline --tree current=.
+"""
+
+import argparse
+import os
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_COMMANDS = (
+    "--help",
+    "version print -f example/version.json",
+    "version --help",
+    "docker --help",
+    "project --help",
+    "ecs --help",
+    "sh true",
+)
+
+
+def _get_command_args(command):
+    return [sys.executable, "-m", "developers_chamber.bin.pydev"] + shlex.split(command)
+
+
+def _get_env(tree):
+    return dict(os.environ, PYTHONPATH=str(tree))
+
+
+def measure_wall_time(tree, command, repeat):
+    """
+    Returns median wall time of the command in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            _get_command_args(command),
+            cwd=tree,
+            env=_get_env(tree),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def count_imported_modules(tree, command):
+    """
+    Returns number of modules imported by the command (according to the "-X importtime" output).
+    """
+    args = _get_command_args(command)
+    result = subprocess.run(
+        args[:1] + ["-X", "importtime"] + args[1:],
+        cwd=tree,
+        env=_get_env(tree),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return sum(
+        1
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "cumulative" not in line
+    )
+
+
+def _parse_tree(value):
+    name, _, path = value.rpartition("=")
+    return name or path, Path(path).resolve()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--tree",
+        action="append",
+        type=_parse_tree,
+        help="[NAME=]PATH of the source tree to benchmark, can be used more times (default: this tree)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="number of runs per command"
+    )
+    parser.add_argument(
+        "commands", nargs="*", default=DEFAULT_COMMANDS, help="pydev commands to run"
+    )
+    args = parser.parse_args()
+
+    trees = args.tree or [("current", ROOT_DIR)]
+    headers = ["command"]
+    for name, _ in trees:
+        headers += ["{} [ms]".format(name), "{} [modules]".format(name)]
+    if len(trees) > 1:
+        headers.append("speedup")
+
+    rows = []
+    for command in args.commands:
+        row = [command]
+        timings = []
+        for _, tree in trees:
+            timings.append(measure_wall_time(tree, command, args.repeat))
+            row += [
+                "{:.0f}".format(timings[-1]),
+                str(count_imported_modules(tree, command)),
+            ]
+        if len(trees) > 1:
+            row.append("{:.2f}x".format(timings[0] / timings[-1]))
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in [headers] + rows) for i in range(len(headers))]
+    for row in [headers] + rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,821 @@
+#!/usr/bin/env python
+"""
+Scale benchmark of the pydev ECS commands.
+
+ECS commands are run in this process against a local stand-in of AWS ECS, CloudWatch Logs, Application Auto
+Scaling and STS APIs (a local HTTP server used with AWS_ENDPOINT_URL setting, so botocore serialization, retries and
+connection pools are the same as with AWS). The stand-in is seeded with a synthetic cluster, simulates tasks which
+start and stop after a delay and it can add latency to every call and throttle calls above the rate limit. Number of
+API calls and wall time of every scenario are printed, for example:
+
+    python benchmarks/ecs_scale.py --services 10 --services 100 --latency 50 --rate-limit 40
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import shlex
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+REGION = "eu-west-1"
+ACCOUNT_ID = "123456789012"
+CLUSTER = "benchmark"
+DEFAULT_SERVICES_COUNTS = (10, 100, 1000)
+# Every tenth service is a daemon service without autoscaling
+DAEMON_SERVICES_RATIO = 10
+MIN_CAPACITY = 2
+
+SCENARIOS = (
+    ("get-services-names", "ecs get-services-names"),
+    ("redeploy-cluster-services", "ecs redeploy-cluster-services"),
+    ("wait-for-services-stable", "ecs wait-for-services-stable"),
+    (
+        "stop-services-and-wait-for-tasks-to-stop",
+        "ecs stop-services-and-wait-for-tasks-to-stop -s {services}",
+    ),
+    ("start-cluster-services", "ecs start-cluster-services"),
+    ("wait-for-services-stable (after start)", "ecs wait-for-services-stable"),
+    # Daemon services have no scalable targets, so their tasks count cannot be determined
+    ("start-services", "ecs start-services -s {replica_services}"),
+    (
+        "stop-services-and-wait-for-tasks-to-stop (before waves)",
+        "ecs stop-services-and-wait-for-tasks-to-stop -s {services}",
+    ),
+    (
+        "start-cluster-services (waves)",
+        'ecs start-cluster-services --tiers "service-1,service-2;service-3" --wave-size 100',
+    ),
+    ("redeploy-services", "ecs redeploy-services -s {services} --wait"),
+    (
+        "deploy-new-task-definition",
+        'ecs deploy-new-task-definition -s service-1 -t service-1 -i \'{{"app": "app:new"}}\' --wait',
+    ),
+    (
+        "update-service-to-latest-task-definition",
+        "ecs update-service-to-latest-task-definition -s service-1 --wait",
+    ),
+    (
+        "register-new-task-definition",
+        'ecs register-new-task-definition -t service-0 -i \'{{"app": "app:new"}}\'',
+    ),
+    (
+        "run-task-and-wait-for-success",
+        "ecs run-task-and-wait-for-success -t service-0 -n app -m true",
+    ),
+    (
+        "run-tasks",
+        "ecs run-tasks -t service-0 -n app -m true -s 10 --success-string 0",
+    ),
+    ("snapshot", "ecs snapshot"),
+    ("get-tasks-for-service", "ecs get-tasks-for-service -s service-1"),
+    (
+        "get-tasks-for-service (cached)",
+        "ecs get-tasks-for-service -s service-1 --cached",
+    ),
+    (
+        "get-task-definition-for-service",
+        "ecs get-task-definition-for-service -s service-1",
+    ),
+)
+
+
+class APIError(Exception):
+    def __init__(self, code, message, status=400):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.status = status
+
+
+def _paginate(items, request, items_key, token_key="nextToken", size_key="maxResults"):
+    start = int(request.get(token_key) or 0)
+    size = request.get(size_key) or 100
+    response = {items_key: items[start : start + size]}
+    if start + size < len(items):
+        response[token_key] = str(start + size)
+    return response
+
+
+class ECSStandIn:
+    """
+    In-memory state of the ECS cluster, its task definitions and autoscaling targets. Tasks of the services are
+    started and stopped lazily when the state is read, task_delay is the time of the task start or stop.
+    """
+
+    def __init__(self, services_count, task_delay):
+        self.task_delay = task_delay
+        self.lock = threading.Lock()
+        self.ids = itertools.count()
+        self.services = {}
+        self.tasks = {}
+        self.task_definitions = {}
+        self.scalable_targets = {}
+
+        now = time.time()
+        for i in range(services_count):
+            name = "service-{}".format(i)
+            task_definition = self._register_task_definition(
+                {"family": name, "containerDefinitions": [self._container()]}
+            )
+            daemon = i % DAEMON_SERVICES_RATIO == 0
+            service = {
+                "serviceName": name,
+                "serviceArn": self._arn("service", CLUSTER, name),
+                "schedulingStrategy": "DAEMON" if daemon else "REPLICA",
+                "taskDefinition": task_definition["taskDefinitionArn"],
+                "desiredCount": 1,
+                "deployments": [],
+                "events": [],
+            }
+            self.services[name] = service
+            self._add_deployment(service)
+            for _ in range(service["desiredCount"]):
+                # Services are stable from the beginning
+                self._start_task(service, started_at=now - task_delay)
+            if not daemon:
+                resource_id = "service/{}/{}".format(CLUSTER, name)
+                self.scalable_targets[resource_id] = {
+                    "ServiceNamespace": "ecs",
+                    "ResourceId": resource_id,
+                    "ScalableDimension": "ecs:service:DesiredCount",
+                    "MinCapacity": MIN_CAPACITY,
+                    "MaxCapacity": MIN_CAPACITY * 2,
+                    "RoleARN": self._arn("role", "autoscaling"),
+                    "CreationTime": now,
+                }
+
+    def _arn(self, resource_type, *names):
+        return "arn:aws:ecs:{}:{}:{}/{}".format(
+            REGION, ACCOUNT_ID, resource_type, "/".join(names)
+        )
+
+    def _container(self, image="app:1"):
+        return {"name": "app", "image": image, "essential": True}
+
+    def _register_task_definition(self, request):
+        family = request["family"]
+        revision = (
+            sum(
+                1
+                for task_definition in self.task_definitions.values()
+                if task_definition["family"] == family
+            )
+            + 1
+        )
+        task_definition = {
+            "taskDefinitionArn": self._arn(
+                "task-definition", "{}:{}".format(family, revision)
+            ),
+            "family": family,
+            "revision": revision,
+            "status": "ACTIVE",
+            "containerDefinitions": request["containerDefinitions"],
+            "executionRoleArn": request.get("executionRoleArn", ""),
+            "taskRoleArn": request.get("taskRoleArn", ""),
+            "networkMode": request.get("networkMode", "bridge"),
+            "requiresCompatibilities": request.get("requiresCompatibilities", ["EC2"]),
+            "volumes": request.get("volumes", []),
+        }
+        self.task_definitions[task_definition["taskDefinitionArn"]] = task_definition
+        self.task_definitions["{}:{}".format(family, revision)] = task_definition
+        self.task_definitions[family] = task_definition
+        return task_definition
+
+    def _get_task_definition(self, name):
+        # Task definition is identified by family or family and revision, optionally in ARN format
+        return self.task_definitions.get(name.split("task-definition/")[-1])
+
+    def _add_deployment(self, service):
+        for deployment in service["deployments"]:
+            deployment["status"] = "ACTIVE"
+        service["deployments"].insert(
+            0,
+            {
+                "id": "ecs-svc/{}".format(next(self.ids)),
+                "status": "PRIMARY",
+                "taskDefinition": service["taskDefinition"],
+                "desiredCount": service["desiredCount"],
+                "failedTasks": 0,
+                "rolloutState": "IN_PROGRESS",
+                "createdAt": time.time(),
+            },
+        )
+
+    def _start_task(self, service, started_at=None, task_definition_arn=None):
+        task_arn = self._arn("task", CLUSTER, "{:032x}".format(next(self.ids)))
+        self.tasks[task_arn] = {
+            "taskArn": task_arn,
+            "service": service["serviceName"] if service else None,
+            "deployment": service["deployments"][0]["id"] if service else None,
+            "taskDefinitionArn": (
+                service["taskDefinition"] if service else task_definition_arn
+            ),
+            "createdAt": started_at or time.time(),
+            "stoppingAt": None,
+        }
+        if service is None:
+            # Standalone task stops itself
+            self.tasks[task_arn]["stoppingAt"] = time.time() + self.task_delay
+        return task_arn
+
+    def _get_task_status(self, task, now):
+        if task["stoppingAt"] is not None and now >= task["stoppingAt"] + (
+            self.task_delay if task["service"] else 0
+        ):
+            return "STOPPED"
+        if now >= task["createdAt"] + self.task_delay:
+            return "RUNNING"
+        return "PROVISIONING"
+
+    def _reconcile(self, service, now):
+        """
+        Starts or stops tasks of the primary deployment to match the desired count and stops tasks of the old
+        deployments when the primary deployment is running.
+        """
+        primary = service["deployments"][0]
+        primary["desiredCount"] = service["desiredCount"]
+        service_tasks = [
+            task
+            for task in self.tasks.values()
+            if task["service"] == service["serviceName"]
+        ]
+        primary_tasks = [
+            task
+            for task in service_tasks
+            if task["deployment"] == primary["id"] and task["stoppingAt"] is None
+        ]
+        for _ in range(service["desiredCount"] - len(primary_tasks)):
+            self._start_task(service)
+        for task in primary_tasks[service["desiredCount"] :]:
+            task["stoppingAt"] = now
+
+        primary_running = sum(
+            1 for task in primary_tasks if self._get_task_status(task, now) == "RUNNING"
+        )
+        if primary_running >= service["desiredCount"]:
+            for task in service_tasks:
+                if task["deployment"] != primary["id"] and task["stoppingAt"] is None:
+                    task["stoppingAt"] = now
+
+        for deployment in service["deployments"]:
+            deployment_tasks = [
+                task
+                for task in self.tasks.values()
+                if task["deployment"] == deployment["id"]
+            ]
+            statuses = Counter(
+                self._get_task_status(task, now) for task in deployment_tasks
+            )
+            deployment["runningCount"] = statuses["RUNNING"]
+            deployment["pendingCount"] = statuses["PROVISIONING"]
+            if deployment is not primary:
+                deployment["desiredCount"] = 0
+
+        service["deployments"] = [primary] + [
+            deployment
+            for deployment in service["deployments"][1:]
+            if deployment["runningCount"] or deployment["pendingCount"]
+        ]
+        if (
+            len(service["deployments"]) == 1
+            and primary["runningCount"] == primary["desiredCount"]
+        ):
+            primary["rolloutState"] = "COMPLETED"
+        service["runningCount"] = sum(
+            deployment["runningCount"] for deployment in service["deployments"]
+        )
+        service["pendingCount"] = sum(
+            deployment["pendingCount"] for deployment in service["deployments"]
+        )
+
+    def _get_service(self, name):
+        name = name.split("/")[-1]
+        if name not in self.services:
+            raise APIError("ServiceNotFoundException", "Service not found.")
+        service = self.services[name]
+        self._reconcile(service, time.time())
+        return service
+
+    def _check_cluster(self, request):
+        if request.get("cluster", "default").split("/")[-1] != CLUSTER:
+            raise APIError("ClusterNotFoundException", "Cluster not found.")
+
+    def _describe_task(self, task, now):
+        status = self._get_task_status(task, now)
+        description = {
+            "taskArn": task["taskArn"],
+            "clusterArn": self._arn("cluster", CLUSTER),
+            "taskDefinitionArn": task["taskDefinitionArn"],
+            "lastStatus": status,
+            "desiredStatus": "STOPPED" if task["stoppingAt"] else "RUNNING",
+            "createdAt": task["createdAt"],
+            "containers": [{"name": "app", "lastStatus": status}],
+            "group": "service:{}".format(task["service"]) if task["service"] else None,
+        }
+        if status == "STOPPED":
+            description.update(
+                stopCode="EssentialContainerExited" if not task["service"] else None,
+                stoppedReason="Essential container in task exited",
+                stoppedAt=task["stoppingAt"],
+            )
+            description["containers"][0]["exitCode"] = 0
+        return {key: value for key, value in description.items() if value is not None}
+
+    # ECS API
+
+    def list_services(self, request):
+        self._check_cluster(request)
+        return _paginate(
+            [service["serviceArn"] for service in self.services.values()],
+            request,
+            "serviceArns",
+        )
+
+    def describe_services(self, request):
+        self._check_cluster(request)
+        if len(request["services"]) > 10:
+            raise APIError(
+                "InvalidParameterException", "Too many services, at most 10 allowed."
+            )
+        services, failures = [], []
+        for name in request["services"]:
+            try:
+                services.append(self._get_service(name))
+            except APIError:
+                failures.append({"arn": name, "reason": "MISSING"})
+        return {"services": services, "failures": failures}
+
+    def update_service(self, request):
+        self._check_cluster(request)
+        service = self._get_service(request["service"])
+        if "desiredCount" in request:
+            service["desiredCount"] = request["desiredCount"]
+        if "taskDefinition" in request:
+            service["taskDefinition"] = self._get_task_definition(
+                request["taskDefinition"]
+            )["taskDefinitionArn"]
+        if request.get("forceNewDeployment") or "taskDefinition" in request:
+            self._add_deployment(service)
+        self._reconcile(service, time.time())
+        return {"service": service}
+
+    def list_tasks(self, request):
+        self._check_cluster(request)
+        now = time.time()
+        if "serviceName" in request:
+            self._get_service(request["serviceName"])
+        desired_status = request.get("desiredStatus", "RUNNING")
+        tasks = [
+            task["taskArn"]
+            for task in self.tasks.values()
+            if (
+                "serviceName" not in request
+                or task["service"] == request["serviceName"]
+            )
+            and (
+                desired_status == "STOPPED"
+                if task["stoppingAt"] is not None
+                and self._get_task_status(task, now) != "RUNNING"
+                else desired_status == "RUNNING"
+            )
+        ]
+        return _paginate(tasks, request, "taskArns")
+
+    def describe_tasks(self, request):
+        self._check_cluster(request)
+        if len(request["tasks"]) > 100:
+            raise APIError(
+                "InvalidParameterException", "Too many tasks, at most 100 allowed."
+            )
+        now = time.time()
+        for service in {
+            self.tasks[task]["service"]
+            for task in request["tasks"]
+            if task in self.tasks and self.tasks[task]["service"]
+        }:
+            self._reconcile(self.services[service], now)
+        return {
+            "tasks": [
+                self._describe_task(self.tasks[task], now)
+                for task in request["tasks"]
+                if task in self.tasks
+            ],
+            "failures": [
+                {"arn": task, "reason": "MISSING"}
+                for task in request["tasks"]
+                if task not in self.tasks
+            ],
+        }
+
+    def run_task(self, request):
+        self._check_cluster(request)
+        task_definition = self._get_task_definition(request["taskDefinition"])
+        if task_definition is None:
+            raise APIError("ClientException", "Task definition not found.")
+        tasks = [
+            self._describe_task(
+                self.tasks[
+                    self._start_task(
+                        None, task_definition_arn=task_definition["taskDefinitionArn"]
+                    )
+                ],
+                time.time(),
+            )
+            for _ in range(request.get("count", 1))
+        ]
+        return {"tasks": tasks, "failures": []}
+
+    def describe_task_definition(self, request):
+        task_definition = self._get_task_definition(request["taskDefinition"])
+        if task_definition is None:
+            raise APIError("ClientException", "Unable to describe task definition.")
+        return {"taskDefinition": task_definition, "tags": []}
+
+    def register_task_definition(self, request):
+        return {"taskDefinition": self._register_task_definition(request)}
+
+    def list_task_definitions(self, request):
+        return _paginate(
+            sorted(
+                {
+                    task_definition["taskDefinitionArn"]
+                    for task_definition in self.task_definitions.values()
+                }
+            ),
+            request,
+            "taskDefinitionArns",
+        )
+
+    # Application Auto Scaling API
+
+    def describe_scalable_targets(self, request):
+        if len(request.get("ResourceIds", [])) > 50:
+            raise APIError(
+                "ValidationException", "Too many resource IDs, at most 50 allowed."
+            )
+        targets = [
+            target
+            for resource_id, target in self.scalable_targets.items()
+            if not request.get("ResourceIds") or resource_id in request["ResourceIds"]
+        ]
+        return _paginate(targets, request, "ScalableTargets", "NextToken", "MaxResults")
+
+    # CloudWatch Logs API
+
+    def get_log_events(self, request):
+        return {
+            "events": [],
+            "nextForwardToken": request.get("nextToken", "f/0"),
+            "nextBackwardToken": "b/0",
+        }
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    HTTP server of the AWS JSON protocol which dispatches the calls to the stand-in. Every call is delayed by the
+    latency and calls above the rate limit (token bucket with one second burst) are throttled.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, stand_in, latency, rate_limit):
+        super().__init__(("127.0.0.1", 0), StandInRequestHandler)
+        self.stand_in = stand_in
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.calls = Counter()
+        self.throttled_calls = Counter()
+        self._tokens = rate_limit
+        self._tokens_updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def endpoint_url(self):
+        return "http://{}:{}".format(*self.server_address)
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls.clear()
+            self.throttled_calls.clear()
+
+    def acquire_token(self):
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.rate_limit,
+                self._tokens + (now - self._tokens_updated_at) * self.rate_limit,
+            )
+            self._tokens_updated_at = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def count_call(self, operation, throttled):
+        with self._lock:
+            self.calls[operation] += 1
+            if throttled:
+                self.throttled_calls[operation] += 1
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-amz-json-1.1")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _do_caller_identity_post(self, body):
+        # STS uses query protocol, only GetCallerIdentity (used for the snapshot key) is supported
+        operation = parse_qs(body.decode()).get("Action", [""])[0]
+        self.server.count_call(operation, False)
+        if operation != "GetCallerIdentity":
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        body = (
+            (
+                '<GetCallerIdentityResponse xmlns="https://sts.amazonaws.com/doc/2011-06-15/">'
+                "<GetCallerIdentityResult><Arn>arn:aws:iam::{0}:user/benchmark</Arn><UserId>benchmark</UserId>"
+                "<Account>{0}</Account></GetCallerIdentityResult>"
+                "<ResponseMetadata><RequestId>benchmark</RequestId></ResponseMetadata>"
+                "</GetCallerIdentityResponse>"
+            )
+            .format(ACCOUNT_ID)
+            .encode()
+        )
+        self.send_response(200)
+        self.send_header("Content-Type", "text/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if "X-Amz-Target" not in self.headers:
+            self._do_caller_identity_post(body)
+            return
+
+        request = json.loads(body)
+        # Target has format "<service prefix>.<operation name>"
+        operation = self.headers["X-Amz-Target"].split(".")[-1]
+        method_name = "".join(
+            "_" + char.lower() if char.isupper() else char for char in operation
+        ).lstrip("_")
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        throttled = not self.server.acquire_token()
+        self.server.count_call(operation, throttled)
+        if throttled:
+            self._send(
+                400, {"__type": "ThrottlingException", "message": "Rate exceeded"}
+            )
+            return
+
+        method = getattr(self.server.stand_in, method_name, None)
+        if method is None:
+            self._send(
+                400,
+                {
+                    "__type": "UnknownOperationException",
+                    "message": "{} is not supported by the stand-in".format(operation),
+                },
+            )
+            return
+        try:
+            with self.server.stand_in.lock:
+                response = method(request)
+        except APIError as ex:
+            self._send(ex.status, {"__type": ex.code, "message": ex.message})
+            return
+        self._send(200, response)
+
+
+@contextlib.contextmanager
+def _aws_environment(endpoint_url, cache_dir):
+    variables = {
+        "AWS_ENDPOINT_URL": endpoint_url,
+        "AWS_ACCESS_KEY_ID": "benchmark",
+        "AWS_SECRET_ACCESS_KEY": "benchmark",
+        "AWS_REGION": REGION,
+        "AWS_DEFAULT_REGION": REGION,
+        "AWS_ECS_CLUSTER": CLUSTER,
+        "AWS_CONFIG_FILE": os.devnull,
+        "AWS_SHARED_CREDENTIALS_FILE": os.devnull,
+        "PYDEV_CACHE_DIR": cache_dir,
+    }
+    original_variables = {name: os.environ.get(name) for name in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for name, value in original_variables.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_command(command):
+    """
+    Runs the pydev command in this process, returns its error message or None if it succeeded.
+    """
+    import click
+
+    from developers_chamber.bin.pydev import cli
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.main(
+                args=shlex.split(command), prog_name="pydev", standalone_mode=False
+            )
+    except click.ClickException as ex:
+        return ex.format_message()
+    except SystemExit as ex:
+        return None if not ex.code else "exit code {}".format(ex.code)
+    return None
+
+
+def run_benchmark(services_count, scenarios, latency, rate_limit, task_delay):
+    """
+    Returns list of (scenario name, number of calls, number of throttled calls, wall time, error) of the scenarios run
+    against a new stand-in with the number of services.
+    """
+    stand_in = ECSStandIn(services_count, task_delay)
+    server = StandInServer(stand_in, latency, rate_limit)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir, _aws_environment(
+        server.endpoint_url, cache_dir
+    ):
+        # Clients are bound to the endpoint of the server
+        from developers_chamber import ecs_utils
+
+        ecs_utils._clients.clear()
+        ecs_utils._sessions.clear()
+        import boto3
+
+        boto3.DEFAULT_SESSION = None
+
+        services = ",".join(stand_in.services)
+        replica_services = ",".join(
+            name
+            for name, service in stand_in.services.items()
+            if service["schedulingStrategy"] == "REPLICA"
+        )
+        for name, command in scenarios:
+            server.reset_counters()
+            start = time.perf_counter()
+            error = run_command(
+                command.format(services=services, replica_services=replica_services)
+            )
+            duration = time.perf_counter() - start
+            results.append(
+                (
+                    name,
+                    dict(server.calls),
+                    sum(server.throttled_calls.values()),
+                    duration,
+                    error,
+                )
+            )
+    server.shutdown()
+    server.server_close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--services",
+        action="append",
+        type=int,
+        help="number of services of the cluster, can be used more times (default: 10, 100 and 1000)",
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=[name for name, _ in SCENARIOS],
+        help="scenario to run, can be used more times (default: all scenarios)",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=20, help="latency of every API call in ms"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=0,
+        help="API calls per second above which calls are throttled (default: no throttling)",
+    )
+    parser.add_argument(
+        "--task-delay",
+        type=float,
+        default=1,
+        help="seconds needed by the simulated tasks to start or stop",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="print results in JSON format"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random jitter")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT_DIR))
+    random.seed(args.seed)
+    # Output of the commands is not measured
+    logging.disable(logging.CRITICAL)
+
+    scenarios = [
+        (name, command)
+        for name, command in SCENARIOS
+        if not args.scenario or name in args.scenario
+    ]
+    results = {}
+    for services_count in args.services or DEFAULT_SERVICES_COUNTS:
+        results[services_count] = run_benchmark(
+            services_count,
+            scenarios,
+            args.latency / 1000,
+            args.rate_limit,
+            args.task_delay,
+        )
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    services_count: [
+                        {
+                            "scenario": name,
+                            "calls": calls,
+                            "throttled_calls": throttled_calls,
+                            "wall_time": duration,
+                            "error": error,
+                        }
+                        for name, calls, throttled_calls, duration, error in scenario_results
+                    ]
+                    for services_count, scenario_results in results.items()
+                },
+                indent=2,
+            )
+        )
+        return
+
+    headers = [
+        "services",
+        "scenario",
+        "calls",
+        "throttled",
+        "wall time [s]",
+        "calls by operation",
+    ]
+    rows = []
+    for services_count, scenario_results in results.items():
+        for name, calls, throttled_calls, duration, error in scenario_results:
+            rows.append(
+                [
+                    str(services_count),
+                    name,
+                    str(sum(calls.values())),
+                    str(throttled_calls),
+                    "{:.2f}".format(duration),
+                    (
+                        ", ".join(
+                            "{} {}".format(operation, count)
+                            for operation, count in sorted(calls.items())
+                        )
+                        + (" FAILED: {}".format(error) if error else "")
+                    ),
+                ]
+            )
+
+    widths = [max(len(row[i]) for row in [headers] + rows) for i in range(len(headers))]
+    for row in [headers] + rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+
+if __name__ == "__main__":
+    main()
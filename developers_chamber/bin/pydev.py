@@ -1,71 +1,61 @@
 #!/usr/bin/env python
-import logging.config
-import os
 import sys
-from pathlib import Path
-from importlib.machinery import SourceFileLoader
-
-import click_completion
-import coloredlogs
-from dotenv import load_dotenv
-from developers_chamber.utils import INSTALLED_MODULES
-
-for config_path in (Path.home(), Path.cwd()):
-    if (config_path / ".pydev").exists() and (config_path / ".pydev").is_dir():
-        for file in sorted((config_path / ".pydev").iterdir()):
-            if (
-                file.is_file()
-                and file.suffix == ".conf"
-                and not file.name.startswith("~")
-            ):
-                load_dotenv(dotenv_path=str(file), override=True)
-
 
-from developers_chamber.scripts import cli
+from developers_chamber.profiling import enable_startup_profiling, profile_subsystem
+from developers_chamber.tracing import enable_tracing
 
-from developers_chamber.scripts import bind
+enable_startup_profiling(sys.argv)
+enable_tracing()
 
-if "bitbucket" in INSTALLED_MODULES:
-    from developers_chamber.scripts.bitbucket import *
-from developers_chamber.scripts.docker import *
-
-if "aws" in INSTALLED_MODULES:
-    from developers_chamber.scripts.ecs import *
-
-if "git" in INSTALLED_MODULES:
-    from developers_chamber.scripts.git import *
+import logging.config
+import os
+from pathlib import Path
+from importlib.machinery import SourceFileLoader
 
-from developers_chamber.scripts.gitlab import *
+import click
 
-if "jira" in INSTALLED_MODULES:
-    from developers_chamber.scripts.jira import *
+with profile_subsystem("click_completion"):
+    import click_completion
 
-if "qa" in INSTALLED_MODULES:
-    from developers_chamber.scripts.qa import *
+with profile_subsystem("coloredlogs"):
+    import coloredlogs
 
-from developers_chamber.scripts.sh import *
+with profile_subsystem("dotenv config"):
+    from dotenv import load_dotenv
 
-if "slack" in INSTALLED_MODULES:
-    from developers_chamber.scripts.slack import *
+    for config_path in (Path.home(), Path.cwd()):
+        if (config_path / ".pydev").exists() and (config_path / ".pydev").is_dir():
+            for file in sorted((config_path / ".pydev").iterdir()):
+                if (
+                    file.is_file()
+                    and file.suffix == ".conf"
+                    and not file.name.startswith("~")
+                ):
+                    load_dotenv(dotenv_path=str(file), override=True)
 
-if "toggle" in INSTALLED_MODULES:
-    from developers_chamber.scripts.toggle import *
+with profile_subsystem("installed modules probes"):
+    from developers_chamber.utils import INSTALLED_MODULES
 
-from developers_chamber.scripts.version import *
-from developers_chamber.scripts.project import *
+with profile_subsystem("scripts"):
+    # Subcommand modules (and their optional dependencies) are imported lazily by the cli group
+    from developers_chamber.scripts import cli
 
-click_completion.init()
+with profile_subsystem("click_completion"):
+    click_completion.init()
 
-# Import external scripts
-for base_path in (Path.home(), Path.cwd()):
-    if (base_path / ".pydev" / "scripts" / "__init__.py").exists():
-        SourceFileLoader(
-            "*", str(base_path / ".pydev" / "scripts" / "__init__.py")
-        ).load_module()
+with profile_subsystem("user scripts"):
+    # Import external scripts
+    for base_path in (Path.home(), Path.cwd()):
+        if (base_path / ".pydev" / "scripts" / "__init__.py").exists():
+            SourceFileLoader(
+                "*", str(base_path / ".pydev" / "scripts" / "__init__.py")
+            ).load_module()
 
-from developers_chamber.scripts.init_aliasses import *
+with profile_subsystem("aliases"):
+    from developers_chamber.scripts.init_aliasses import *
 
-coloredlogs.install(milliseconds=True)
+with profile_subsystem("coloredlogs"):
+    coloredlogs.install(milliseconds=True)
 
 
 @cli.command()
@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+import sys
+
+from developers_chamber.server import run_client
+
+
+def main():
+    sys.exit(run_client(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
-import requests
 from click import UsageError
 from requests.auth import HTTPBasicAuth
 
+from developers_chamber.utils import get_http_session
+
 
 def get_commit_builds(username, password, repository_name, commit):
-    response = requests.get(
+    response = get_http_session().get(
         "https://api.bitbucket.org/2.0/repositories/{repository}/commit/{commit}/statuses".format(
             repository=repository_name, commit=commit
         ),
@@ -21,7 +22,7 @@ def get_commit_builds(username, password, repository_name, commit):
 
 
 def get_current_user_uuid(username, password):
-    response = requests.get(
+    response = get_http_session().get(
         "https://api.bitbucket.org/2.0/user",
         headers={"content-type": "application/json"},
         auth=HTTPBasicAuth(username, password),
@@ -35,7 +36,7 @@ def get_default_reviewers(username, password, repository_name):
     url = "https://api.bitbucket.org/2.0/repositories/{repository}/default-reviewers".format(
         repository=repository_name
     )
-    response = requests.get(
+    response = get_http_session().get(
         url,
         headers={"content-type": "application/json"},
         auth=HTTPBasicAuth(username, password),
@@ -69,7 +70,7 @@ def create_pull_request(
         "destination": {"branch": {"name": destination_branch_name}},
         "reviewers": get_default_reviewers(username, password, repository_name),
     }
-    response = requests.post(
+    response = get_http_session().post(
         url,
         headers={"content-type": "application/json"},
         json=json_data,
@@ -1,10 +1,22 @@
+import logging
 import re
 import shlex
+import subprocess
+import sys
+import threading
+from contextlib import ExitStack
 from gettext import gettext as _
+from multiprocessing.pool import ThreadPool
 
 import click
 from click.formatting import wrap_text
 
+from developers_chamber.tracing import command_span, trace_command
+
+LOGGER = logging.getLogger()
+
+PARALLEL_STEP_KEY = "parallel"
+
 
 def find_and_replace_command_variable(arg, command, index):
     match = re.match(r"^--(?P<arg_name>[^=\ ]+)[\ =](?P<arg_value>.+)", arg)
@@ -41,11 +53,123 @@ def parse_alias(alias):
     return used_command_parts, command_parts, click_command, alias
 
 
+def compile_alias(alias):
+    """
+    Returns path of the aliased command (list of command names and click commands without the root command) and
+    tokens of the command arguments with unresolved variables.
+    """
+    from developers_chamber.scripts import cli
+
+    used_command_parts, remaining_command_parts, __, __ = parse_alias(alias)
+    command_path = []
+    click_command = cli
+    for command_part in used_command_parts:
+        click_command = click_command.get_command(None, command_part)
+        command_path.append((command_part, click_command))
+    return command_path, remaining_command_parts
+
+
+def substitute_alias_args(args_template, args, extra_args):
+    """
+    Returns command arguments with the alias variables replaced with the alias arguments.
+    """
+    command_args = []
+    for arg_template in args_template:
+        if arg_template == "$@":
+            command_args += args
+            continue
+        for index, arg in enumerate(args, start=1):
+            __, arg_template = find_and_replace_command_variable(
+                arg, arg_template, index
+            )
+        command_args.append(arg_template.replace("$@", " ".join(args)))
+    return command_args + extra_args
+
+
+def invoke_command_path(ctx, command_path, args):
+    """
+    Invokes the command in the context tree of the current command without parsing the whole command line again.
+    """
+    with ExitStack() as stack:
+        parent_ctx = ctx.find_root()
+        for (name, group), (subcommand_name, __) in zip(command_path, command_path[1:]):
+            # Only the group parameters are parsed, the subcommand is invoked directly
+            group_ctx = stack.enter_context(
+                group.make_context(name, [subcommand_name], parent=parent_ctx)
+            )
+            if group.callback is not None:
+                group_ctx.invoke(group.callback, **group_ctx.params)
+            parent_ctx = group_ctx
+
+        name, command = command_path[-1]
+        command_ctx = stack.enter_context(
+            command.make_context(name, list(args), parent=parent_ctx)
+        )
+        return command.invoke(command_ctx)
+
+
+def _get_step_commands(step):
+    return step[PARALLEL_STEP_KEY] if isinstance(step, dict) else [step]
+
+
+def _run_parallel_command(index, command_args, output_lock):
+    """
+    Runs pydev command in a subprocess, its output lines are prefixed with the command index. Returns exit code.
+    """
+    with trace_command(["pydev"] + command_args):
+        process = subprocess.Popen(
+            [sys.executable, "-m", "developers_chamber.bin.pydev"] + command_args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+        )
+        for line in process.stdout:
+            with output_lock:
+                click.echo("[{}] {}".format(index, line.rstrip("\n")))
+        return process.wait()
+
+
+def run_parallel_commands(commands_args):
+    """
+    Runs pydev commands concurrently and raises exception if any of them fails.
+    """
+    output_lock = threading.Lock()
+    for index, command_args in enumerate(commands_args, start=1):
+        LOGGER.info("[{}] pydev {}".format(index, shlex.join(command_args)))
+
+    with ThreadPool(len(commands_args)) as pool:
+        exit_codes = pool.starmap(
+            _run_parallel_command,
+            [
+                (index, command_args, output_lock)
+                for index, command_args in enumerate(commands_args, start=1)
+            ],
+        )
+
+    failed_commands = [
+        "[{}] pydev {} (exit code {})".format(
+            index, shlex.join(command_args), exit_code
+        )
+        for index, (command_args, exit_code) in enumerate(
+            zip(commands_args, exit_codes), start=1
+        )
+        if exit_code != 0
+    ]
+    if failed_commands:
+        raise click.ClickException(
+            "Parallel commands failed:\n{}".format("\n".join(failed_commands))
+        )
+
+
 class AliasCommand(click.Command):
 
     def __init__(self, commands, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._parse_alias(commands)
+        self._aliases = None
+        self._plan = None
 
     def _parse_alias(self, commands):
         if isinstance(commands, str):
@@ -60,10 +184,43 @@ class AliasCommand(click.Command):
         else:
             raise click.ClickException("Invalid alias type")
 
-        commands = [commands] if isinstance(commands, str) else commands
-        self.aliases = [(parse_alias(alias)) for alias in commands]
+        self.commands = [commands] if isinstance(commands, str) else commands
+        for step in self.commands:
+            if isinstance(step, dict) and not (
+                isinstance(step.get(PARALLEL_STEP_KEY), list)
+                and all(isinstance(command, str) for command in step[PARALLEL_STEP_KEY])
+            ):
+                raise click.ClickException(
+                    'Parallel alias step must contain list of commands in "{}" key'.format(
+                        PARALLEL_STEP_KEY
+                    )
+                )
         self.short_help = description
 
+    def resolve_aliases(self):
+        """
+        Resolves aliased commands in the command tree, modules of the aliased commands are imported.
+        """
+        return [
+            parse_alias(alias)
+            for step in self.commands
+            for alias in _get_step_commands(step)
+        ]
+
+    @property
+    def aliases(self):
+        """
+        Aliased commands are resolved only when the alias help is shown. Resolved aliases are taken from the
+        commands manifest if it is possible.
+        """
+        if self._aliases is None:
+            from developers_chamber.scripts import cli
+
+            self._aliases = cli.get_manifest_aliases(self.name)
+            if self._aliases is None:
+                self._aliases = self.resolve_aliases()
+        return self._aliases
+
     def format_help_text(self, ctx, formatter) -> None:
         formatter.write_paragraph()
         with formatter.indentation():
@@ -104,27 +261,60 @@ class AliasCommand(click.Command):
 
         return [CompletionItem(param, type="file")]
 
-    def invoke(self, ctx):
-        from developers_chamber.scripts import cli
-
-        for i, (
-            used_command_parts,
-            remaining_command_parts,
-            click_command,
-            alias_str,
-        ) in enumerate(self.aliases):
-            if i == 0:
-                alias_args = []
-
-                for index, arg in enumerate(ctx.args, start=1):
-                    replaced_arg, alias_str = find_and_replace_command_variable(
-                        arg, alias_str, index
-                    )
-                    if not replaced_arg:
-                        alias_args.append(arg)
+    def get_plan(self):
+        """
+        Returns aliased commands compiled to steps. Command of a step is resolved in the command tree and its arguments
+        are tokenized only once, parallel step contains tokenized commands which are run in subprocesses.
+        """
+        if self._plan is None:
+            self._plan = [
+                (
+                    [shlex.split(alias_str) for alias_str in step[PARALLEL_STEP_KEY]]
+                    if isinstance(step, dict)
+                    else compile_alias(step)
+                )
+                for step in self.commands
+            ]
+        return self._plan
+
+    def _get_extra_args(self, args):
+        """
+        Returns alias arguments which are not used as variables in any aliased command.
+        """
+        alias_strs = [
+            alias_str
+            for step in self.commands
+            for alias_str in _get_step_commands(step)
+        ]
+        if any("$@" in alias_str for alias_str in alias_strs):
+            return []
+        return [
+            arg
+            for index, arg in enumerate(args, start=1)
+            if not any(
+                find_and_replace_command_variable(arg, alias_str, index)[0]
+                for alias_str in alias_strs
+            )
+        ]
 
-                if "$@" in alias_str:
-                    alias_str = alias_str.replace("$@", " ".join(ctx.args))
-                    alias_args = []
+    def invoke(self, ctx):
+        with command_span(ctx):
+            self._invoke_steps(ctx)
 
-            cli.main(args=shlex.split(alias_str) + alias_args, standalone_mode=False)
+    def _invoke_steps(self, ctx):
+        extra_args = self._get_extra_args(ctx.args)
+        for step, compiled_step in zip(self.commands, self.get_plan()):
+            if isinstance(step, dict):
+                run_parallel_commands(
+                    [
+                        substitute_alias_args(args_template, ctx.args, extra_args)
+                        for args_template in compiled_step
+                    ]
+                )
+            else:
+                command_path, args_template = compiled_step
+                invoke_command_path(
+                    ctx,
+                    command_path,
+                    substitute_alias_args(args_template, ctx.args, extra_args),
+                )
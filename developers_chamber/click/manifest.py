@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import click
+
+from developers_chamber.click.alias import AliasCommand
+from developers_chamber.utils import INSTALLED_MODULES, get_cache_dir
+
+MANIFEST_FORMAT = 2
+
+
+def _get_package_version():
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("developers-chamber")
+    except PackageNotFoundError:
+        # Not installed package (e.g. used from the source tree), changes of the source files are tracked instead
+        package_dir = Path(__file__).resolve().parent.parent
+        return "dev-{}".format(
+            max(path.stat().st_mtime for path in package_dir.rglob("*.py"))
+        )
+
+
+def get_manifest_key():
+    """
+    Returns values which invalidate the commands manifest if they are changed.
+    """
+    scripts = []
+    for base_path in (Path.home(), Path.cwd()):
+        scripts_path = base_path / ".pydev" / "scripts" / "__init__.py"
+        if scripts_path.exists():
+            scripts.append([str(scripts_path), scripts_path.stat().st_mtime])
+
+    return {
+        "format": MANIFEST_FORMAT,
+        "version": _get_package_version(),
+        "scripts": scripts,
+        "aliases": os.environ.get("ALIASES", "{}"),
+        "installed_modules": INSTALLED_MODULES,
+    }
+
+
+def _get_manifest_path(key):
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+    return get_cache_dir() / "manifest-{}.json".format(digest[:16])
+
+
+def _describe_type(param_type):
+    if isinstance(param_type, click.Choice):
+        return {
+            "name": "choice",
+            "choices": [str(choice) for choice in param_type.choices],
+        }
+    elif isinstance(param_type, (click.Path, click.File)):
+        return {"name": "path"}
+    else:
+        return {"name": "string"}
+
+
+def _describe_param(param):
+    data = {
+        "param_type_name": param.param_type_name,
+        "name": param.name,
+        "opts": param.opts,
+        "secondary_opts": param.secondary_opts,
+        "nargs": param.nargs,
+        "multiple": param.multiple,
+        "type": _describe_type(param.type),
+    }
+    if isinstance(param, click.Option):
+        data.update(
+            help=param.help,
+            hidden=param.hidden,
+            is_flag=param.is_flag,
+            count=param.count,
+        )
+    return data
+
+
+def describe_command(ctx, command):
+    """
+    Returns JSON serializable description of the click command with its options and subcommands.
+    """
+    data = {
+        "name": command.name,
+        "help": command.help,
+        "short_help": command.short_help,
+        "hidden": command.hidden,
+        "params": [_describe_param(param) for param in command.params],
+    }
+    if isinstance(command, AliasCommand):
+        try:
+            data["aliases"] = [
+                [used_command_parts, remaining_command_parts, alias_str]
+                for used_command_parts, remaining_command_parts, _, alias_str in command.resolve_aliases()
+            ]
+        except click.ClickException:
+            # Invalid alias is reported when it is used
+            pass
+    elif isinstance(command, click.Group):
+        data["commands"] = {}
+        for name in command.list_commands(ctx):
+            subcommand = command.get_command(ctx, name)
+            if subcommand is not None:
+                data["commands"][name] = describe_command(ctx, subcommand)
+    return data
+
+
+def _build_type(data):
+    if data["name"] == "choice":
+        return click.Choice(data["choices"])
+    elif data["name"] == "path":
+        return click.Path()
+    else:
+        return click.STRING
+
+
+def _build_param(data):
+    if data["param_type_name"] == "argument":
+        return click.Argument(
+            [data["name"]],
+            type=_build_type(data["type"]),
+            nargs=data["nargs"],
+            required=False,
+        )
+
+    kwargs = dict(help=data["help"], hidden=data["hidden"], multiple=data["multiple"])
+    if data["is_flag"]:
+        kwargs["is_flag"] = True
+    elif data["count"]:
+        kwargs["count"] = True
+    else:
+        kwargs["type"] = _build_type(data["type"])
+    return click.Option(
+        [data["name"]] + data["opts"] + data["secondary_opts"], **kwargs
+    )
+
+
+def build_command(data):
+    """
+    Returns click command built from its description. The command is used for help and shell completion only,
+    it has no callback.
+    """
+    kwargs = dict(
+        name=data["name"],
+        help=data["help"],
+        short_help=data["short_help"],
+        hidden=data["hidden"],
+        params=[_build_param(param) for param in data["params"]],
+    )
+    if "commands" in data:
+        return click.Group(
+            commands={
+                name: build_command(subcommand_data)
+                for name, subcommand_data in data["commands"].items()
+            },
+            **kwargs,
+        )
+    return click.Command(**kwargs)
+
+
+def load_manifest(root_command):
+    """
+    Returns commands manifest of the root command. The manifest is stored in the pydev cache directory and it is
+    rebuilt if it does not exist for the current package version, external scripts and aliases.
+    """
+    key = get_manifest_key()
+    try:
+        manifest_path = _get_manifest_path(key)
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    # All commands modules are imported to build the manifest
+    manifest = {
+        "key": key,
+        "command": describe_command(
+            click.Context(root_command, info_name=root_command.name), root_command
+        ),
+    }
+    try:
+        manifest_path = _get_manifest_path(key)
+        tmp_manifest_path = manifest_path.with_suffix(".{}.tmp".format(os.getpid()))
+        with open(tmp_manifest_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_manifest_path, manifest_path)
+    except OSError:
+        pass
+    return manifest
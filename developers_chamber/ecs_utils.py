@@ -1,35 +1,408 @@
+import contextvars
+import copy
+import hashlib
+import heapq
 import json
 import logging
-from datetime import datetime
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from multiprocessing.pool import ThreadPool
 
 import boto3
 from botocore.client import Config
-from botocore.exceptions import ClientError, WaiterError
+from botocore.exceptions import ClientError
 from click import ClickException
 
+from developers_chamber.tracing import trace_boto3_client
+from developers_chamber.utils import get_cache_dir
+
 LOGGER = logging.getLogger()
 
+# Prefix of the messages logged by the helpers, it is used to distinguish output of commands run concurrently
+log_prefix = contextvars.ContextVar("log_prefix", default=None)
+
+
+class _LogPrefixFilter(logging.Filter):
+    def filter(self, record):
+        prefix = log_prefix.get()
+        if prefix is not None:
+            record.msg = "[{}] {}".format(prefix, record.msg)
+        return True
+
+
+LOGGER.addFilter(_LogPrefixFilter())
+
+
+# Throttled calls are retried only by botocore, adaptive mode also limits the rate of the client calls
+CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={
+        "mode": "adaptive",
+        "max_attempts": 10,
+    },
+)
+
+DESCRIBE_SERVICES_CHUNK_SIZE = (
+    10  # maximum number of services of one describe_services call
+)
+DESCRIBE_SERVICES_THREAD_MAX = 16
+CACHED_SERVICE_ATTRIBUTES = (
+    "serviceName",
+    "serviceArn",
+    "status",
+    "schedulingStrategy",
+    "taskDefinition",
+    "desiredCount",
+    "runningCount",
+    "pendingCount",
+    "deployments",
+    "events",
+)
+
+DESCRIBE_TASKS_CHUNK_SIZE = 100  # maximum number of tasks of one describe_tasks call
+DESCRIBE_SCALABLE_TARGETS_CHUNK_SIZE = (
+    50  # maximum number of resources of one describe_scalable_targets call
+)
+TASKS_POLL_MIN_DELAY = 1
+TASKS_POLL_MAX_DELAY = 15
+DEFAULT_TASKS_START_TIMEOUT = 600
+LOGS_POLL_MIN_DELAY = 1
+LOGS_POLL_MAX_DELAY = 5
+LOGS_FETCH_THREAD_MAX = 16
+ROLLOUT_POLL_MIN_DELAY = 2
+ROLLOUT_POLL_MAX_DELAY = 15
+DEFAULT_ROLLOUT_TIMEOUT = 600
+DEFAULT_MAX_FAILED_TASKS = 3
+DEFAULT_PARALLELISM = 10
+SHARD_INDEX_VARIABLE = "SHARD_INDEX"
+SHARD_COUNT_VARIABLE = "SHARD_COUNT"
+THROTTLING_ERROR_CODES = (
+    "Throttling",
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+)
+
+_sessions = {}
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_session(profile=None):
+    """
+    Returns boto3 session of the AWS profile, the default session is used if profile is not set.
+    """
+    if profile not in _sessions:
+        default_session = boto3._get_default_session()
+        if profile is None:
+            _sessions[profile] = default_session
+        else:
+            session = boto3.Session(profile_name=profile)
+            # Loaded service models are shared by all sessions
+            session._session.register_component(
+                "data_loader", default_session._session.get_component("data_loader")
+            )
+            _sessions[profile] = session
+    return _sessions[profile]
+
+
+def _get_client(service_name, region, profile=None):
+    """
+    Returns boto3 client from the process-wide registry, so the client and its connection pool are created only once.
+    """
+    key = (service_name, region, profile)
+    # Creating clients from one session is not thread safe
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = trace_boto3_client(
+                _get_session(profile).client(
+                    service_name, region_name=region, config=CLIENT_CONFIG
+                )
+            )
+        return _clients[key]
+
+
+def _get_ecs_client(region, profile=None):
+    return _get_client("ecs", region, profile)
+
+
+def _get_logs_client(region, profile=None):
+    return _get_client("logs", region, profile)
+
+
+def _get_autoscaling_client(region, profile=None):
+    return _get_client("application-autoscaling", region, profile)
+
+
+def _in_current_context(func):
+    """
+    Returns function which runs func in a copy of the current context, it is used for functions run by other threads
+    so they share the context variables (e.g. the log prefix) with the caller.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return run
+
+
+def _is_throttling_error(ex):
+    # ClientError is usually re-raised as ClickException, it is found in the exception context
+    while ex is not None:
+        if (
+            isinstance(ex, ClientError)
+            and ex.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+        ):
+            return True
+        ex = ex.__cause__ or ex.__context__
+    return False
+
+
+def _call_for_services(operation, func, services, parallelism):
+    """
+    Calls the function for every service concurrently (at most parallelism calls at once), logs the report and returns
+    dictionary of services and the function results and dictionary of failed services and their errors.
+    """
+    if parallelism < 1:
+        raise ClickException("Parallelism must be greater than zero.")
+
+    def run(service):
+        start = time.perf_counter()
+        try:
+            result = func(service)
+            error = None
+        except ClickException as ex:
+            result, error = None, ex.format_message()
+        except Exception as ex:
+            result, error = None, str(ex)
+        return service, result, error, time.perf_counter() - start
+
+    if not services:
+        return {}, {}
+
+    with ThreadPool(min(parallelism, len(services))) as pool:
+        services_results = pool.map(_in_current_context(run), services)
+
+    LOGGER.info("{} report:".format(operation.capitalize()))
+    for service, _, error, duration in services_results:
+        LOGGER.info(
+            "  {}: {} [{:.1f}s]".format(
+                service,
+                "OK" if error is None else "FAILED ({})".format(error),
+                duration,
+            )
+        )
+
+    return (
+        {
+            service: result
+            for service, result, error, _ in services_results
+            if error is None
+        },
+        {
+            service: error
+            for service, _, error, _ in services_results
+            if error is not None
+        },
+    )
 
-def _get_ecs_client(region):
-    return boto3.client(
-        "ecs",
-        config=Config(region_name=region),
+
+def run_for_services(operation, func, services, parallelism=DEFAULT_PARALLELISM):
+    """
+    Calls the function for every service concurrently (at most parallelism calls at once) and returns dictionary of
+    services and the function results. Every service is attempted even if some of them fail, ClickException with the
+    failed services is raised at the end.
+    """
+    services_results, failed_services = _call_for_services(
+        operation, func, services, parallelism
     )
+    if failed_services:
+        raise ClickException(
+            "{} failed for {} of {} services: {}".format(
+                operation.capitalize(),
+                len(failed_services),
+                len(services),
+                ", ".join(failed_services),
+            )
+        )
+    return services_results
+
+
+def poll_until(
+    operation, check, timeout, min_delay, max_delay, timeout_message, stop_event=None
+):
+    """
+    Calls the check function until it returns finished flag and returns the number of calls. The check function returns
+    tuple of finished and changed flags. The delay between calls starts at min_delay, it is doubled (up to max_delay)
+    while nothing changes or the check is throttled and it is reset when a change is observed. Every delay is
+    randomized (jitter) and the timeout is a wall-clock deadline of the whole polling (None for no deadline).
+    Delays are interrupted when the stop event is set.
+    """
+    start = time.monotonic()
+    deadline = start + timeout if timeout is not None else None
+    delay = min_delay
+    polls = 0
+    while True:
+        polls += 1
+        try:
+            finished, changed = check()
+        except Exception as ex:
+            if not _is_throttling_error(ex):
+                raise
+            LOGGER.warning("AWS API call was throttled, polling is slowed down")
+            finished, changed = False, False
+
+        if finished:
+            LOGGER.info(
+                "{} finished after {} polls in {:.1f}s.".format(
+                    operation[:1].upper() + operation[1:],
+                    polls,
+                    time.monotonic() - start,
+                )
+            )
+            return polls
+
+        now = time.monotonic()
+        if deadline is not None and now >= deadline:
+            raise ClickException(
+                "Timeout after {} polls: {}".format(polls, timeout_message())
+            )
+
+        if changed:
+            delay = min_delay
+        sleep = random.uniform(delay / 2, delay)
+        if deadline is not None:
+            sleep = min(sleep, deadline - now)
+        if stop_event is not None:
+            stop_event.wait(sleep)
+        else:
+            time.sleep(sleep)
+        if not changed:
+            delay = min(delay * 2, max_delay)
+
+
+def _get_service_name(service):
+    return service.split("/")[-1]
 
 
-def _get_logs_client(region):
-    return boto3.client(
-        "logs",
-        config=Config(region_name=region),
+class ServicesCache:
+    """
+    Metadata of the described services which is shared by the helpers (and their threads) called by one pydev
+    invocation. The cache is passed to the helpers with services_cache argument, services updated by the helpers are
+    removed from it. Metadata are not cached if the argument is not set.
+    """
+
+    def __init__(self):
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def get(self, cluster, services_names, region):
+        with self._lock:
+            return {
+                service_name: self._services[(region, cluster, service_name)]
+                for service_name in services_names
+                if (region, cluster, service_name) in self._services
+            }
+
+    def update(self, cluster, services, region):
+        with self._lock:
+            for service in services:
+                self._services[(region, cluster, service["serviceName"])] = service
+
+    def invalidate(self, cluster, service, region):
+        with self._lock:
+            self._services.pop((region, cluster, _get_service_name(service)), None)
+
+
+def _invalidate_service(cluster, service, region, services_cache):
+    if services_cache is not None:
+        services_cache.invalidate(cluster, service, region)
+    _invalidate_snapshot_service(cluster, service, region)
+
+
+def _describe_services_chunk(cluster, services, region, ecs_client):
+    try:
+        response = ecs_client.describe_services(cluster=cluster, services=services)
+    except ecs_client.exceptions.ClusterNotFoundException:
+        raise ClickException("Cluster not found: '{}'".format(cluster))
+    except ClientError as ex:
+        raise ClickException(ex)
+
+    return [
+        {key: service[key] for key in CACHED_SERVICE_ATTRIBUTES if key in service}
+        for service in response["services"]
+    ]
+
+
+def describe_services(cluster, services, region, ecs_client=None, services_cache=None):
+    """
+    Returns dictionary of service names and their metadata (scheduling strategy, task definition, desired, running
+    and pending counts and deployments). Services are described in chunks of 10 services which are loaded
+    concurrently, services found in services_cache are not described again. Not existing services are omitted.
+    """
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+    services_cache = services_cache if services_cache is not None else ServicesCache()
+
+    services_names = [_get_service_name(service) for service in services]
+    cached_services = services_cache.get(cluster, services_names, region)
+    missing_services_names = list(
+        dict.fromkeys(
+            service_name
+            for service_name in services_names
+            if service_name not in cached_services
+        )
     )
+    chunks = [
+        missing_services_names[i : i + DESCRIBE_SERVICES_CHUNK_SIZE]
+        for i in range(0, len(missing_services_names), DESCRIBE_SERVICES_CHUNK_SIZE)
+    ]
+    if len(chunks) == 1:
+        described_chunks = [
+            _describe_services_chunk(cluster, chunks[0], region, ecs_client)
+        ]
+    elif chunks:
+        with ThreadPool(min(len(chunks), DESCRIBE_SERVICES_THREAD_MAX)) as pool:
+            described_chunks = pool.starmap(
+                _in_current_context(_describe_services_chunk),
+                ((cluster, chunk, region, ecs_client) for chunk in chunks),
+            )
+    else:
+        described_chunks = []
+
+    for described_services in described_chunks:
+        services_cache.update(cluster, described_services, region)
+        cached_services.update(
+            (service["serviceName"], service) for service in described_services
+        )
+
+    return {
+        service_name: cached_services[service_name]
+        for service_name in services_names
+        if service_name in cached_services
+    }
 
 
-def _get_autoscaling_client(region):
-    return boto3.client(
-        "application-autoscaling",
-        config=Config(region_name=region),
+def get_service(cluster, service, region, ecs_client=None, services_cache=None):
+    """
+    Returns metadata of the service.
+    """
+    service_name = _get_service_name(service)
+    services = describe_services(
+        cluster=cluster,
+        services=[service_name],
+        region=region,
+        ecs_client=ecs_client,
+        services_cache=services_cache,
     )
+    if service_name not in services:
+        raise ClickException("Service not found: '{}'".format(service))
+    return services[service_name]
 
 
 def get_log_events(log_group, log_stream, region):
@@ -47,7 +420,248 @@ def get_log_events(log_group, log_stream, region):
         raise ClickException(str(ex))
 
 
+class _LogStreamReader:
+    """
+    Reader of the log stream events, events are read page by page with forward tokens and only the current page is
+    kept in memory. The log stream may not exist when the reading starts.
+    """
+
+    def __init__(self, name, log_group, log_stream, region):
+        self.name = name
+        self.log_group = log_group
+        self.log_stream = log_stream
+        self.logs_client = _get_logs_client(region)
+        self.events = deque()
+        self.caught_up = False
+        self._next_token = None
+        self._last_timestamp = None
+
+    def fetch(self):
+        kwargs = dict(
+            logGroupName=self.log_group,
+            logStreamName=self.log_stream,
+            startFromHead=True,
+        )
+        if self._next_token is not None:
+            kwargs["nextToken"] = self._next_token
+        elif self._last_timestamp is not None:
+            kwargs["startTime"] = self._last_timestamp + 1
+
+        try:
+            response = self.logs_client.get_log_events(**kwargs)
+        except self.logs_client.exceptions.ResourceNotFoundException:
+            # Log stream is created when the container starts
+            response = {"events": [], "nextForwardToken": None}
+        except ClientError as ex:
+            if self._next_token is None:
+                raise ClickException(ex)
+            # Reading continues from the last seen timestamp when the token cannot be used
+            self._next_token = None
+            return self.fetch()
+
+        self.events = deque(response["events"])
+        self.caught_up = not self.events
+        if self.events:
+            self._last_timestamp = self.events[-1]["timestamp"]
+        self._next_token = response["nextForwardToken"]
+
+
+def tail_log_streams(streams, callback, stop_event):
+    """
+    Calls the callback with the stream name and the event for every new event of the log streams (list of tuples of
+    name, log group, log stream and region) until the stop event is set, the remaining events are read after that.
+    Streams are fetched concurrently and their events are merged by timestamp with a k-way merge, so at most one page
+    of every stream is kept in memory.
+    """
+    readers = [
+        _LogStreamReader(name, log_group, log_stream, region)
+        for name, log_group, log_stream, region in streams
+    ]
+
+    def merge_events():
+        heap = [
+            (reader.events[0]["timestamp"], i, reader)
+            for i, reader in enumerate(readers)
+            if reader.events
+        ]
+        heapq.heapify(heap)
+        while heap:
+            _, i, reader = heapq.heappop(heap)
+            callback(reader.name, reader.events.popleft())
+            if reader.events:
+                heapq.heappush(heap, (reader.events[0]["timestamp"], i, reader))
+            else:
+                # The next page of the stream must be fetched before the merge can continue
+                break
+
+    with ThreadPool(min(len(readers), LOGS_FETCH_THREAD_MAX)) as pool:
+
+        def check():
+            stopping = stop_event.is_set()
+            changed = False
+            # Pages are read until all streams are caught up
+            while True:
+                pool.map(
+                    _in_current_context(_LogStreamReader.fetch),
+                    [reader for reader in readers if not reader.events],
+                )
+                changed = changed or any(reader.events for reader in readers)
+                merge_events()
+                if all(reader.caught_up for reader in readers):
+                    return stopping, changed
+
+        poll_until(
+            "tailing of logs",
+            check,
+            None,
+            LOGS_POLL_MIN_DELAY,
+            LOGS_POLL_MAX_DELAY,
+            timeout_message=None,
+            stop_event=stop_event,
+        )
+
+
+def _get_log_streams(task_definition_description, task_id, region):
+    log_streams = []
+    for container_definition in task_definition_description["containerDefinitions"]:
+        log_configuration = container_definition.get("logConfiguration") or {}
+        options = log_configuration.get("options", {})
+        # Stream name can be determined only with the stream prefix
+        if (
+            log_configuration.get("logDriver") == "awslogs"
+            and "awslogs-stream-prefix" in options
+        ):
+            log_streams.append(
+                (
+                    container_definition["name"],
+                    options["awslogs-group"],
+                    "{}/{}/{}".format(
+                        options["awslogs-stream-prefix"],
+                        container_definition["name"],
+                        task_id,
+                    ),
+                    options.get("awslogs-region", region),
+                )
+            )
+
+    if not log_streams:
+        log_streams = [
+            (
+                container_definition["name"],
+                task_definition_description["family"],
+                "ecs/{}/{}".format(container_definition["name"], task_id),
+                region,
+            )
+            for container_definition in task_definition_description[
+                "containerDefinitions"
+            ]
+        ]
+    return log_streams
+
+
+def get_task_log_streams(task_definition, task_id, region, ecs_client=None):
+    """
+    Returns list of tuples of container name, log group, log stream and region of the task containers which use the
+    awslogs log driver. Log group with the task definition name and stream prefix "ecs" is expected for a task
+    definition without log configuration.
+    """
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+
+    try:
+        response = ecs_client.describe_task_definition(taskDefinition=task_definition)
+    except ClientError as ex:
+        raise ClickException(ex)
+
+    return _get_log_streams(response["taskDefinition"], task_id, region)
+
+
+TASK_DEFINITIONS_LEDGER_FILENAME = "task-definitions.json"
+SNAPSHOT_FILENAME = "ecs-snapshot-{}-{}-{}.json"
+ACCOUNTS_FILENAME = "aws-accounts.json"
+DEFAULT_SNAPSHOT_TTL = 300
+SNAPSHOT_SERVICE_ATTRIBUTES = (
+    "serviceName",
+    "serviceArn",
+    "schedulingStrategy",
+    "taskDefinition",
+    "desiredCount",
+    "runningCount",
+    "pendingCount",
+)
+
+
+def _get_task_definition_payload(task_definition_response):
+    """
+    Returns arguments of register_task_definition call which registers the same task definition.
+    """
+    definition = task_definition_response["taskDefinition"]
+    payload = {
+        "containerDefinitions": definition["containerDefinitions"],
+        "executionRoleArn": definition["executionRoleArn"],
+        "family": definition["family"],
+        "networkMode": definition["networkMode"],
+        "requiresCompatibilities": definition["requiresCompatibilities"],
+        "tags": task_definition_response["tags"],
+        "taskRoleArn": definition["taskRoleArn"],
+        "volumes": definition["volumes"],
+    }
+
+    if "cpu" in definition:
+        payload["cpu"] = definition["cpu"]
+    if "memory" in definition:
+        payload["memory"] = definition["memory"]
+    return payload
+
+
+def _get_task_definition_hash(payload, region):
+    normalized_payload = dict(
+        payload, tags=sorted(payload["tags"], key=lambda tag: tag["key"])
+    )
+    return hashlib.sha256(
+        json.dumps([region, normalized_payload], sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _load_task_definitions_ledger():
+    """
+    Returns local ledger of task definitions hashes and ARNs of the registered task definitions.
+    """
+    try:
+        with open(get_cache_dir() / TASK_DEFINITIONS_LEDGER_FILENAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_to_task_definitions_ledger(task_definition_hash, task_definition_arn):
+    ledger = _load_task_definitions_ledger()
+    ledger[task_definition_hash] = task_definition_arn
+    try:
+        ledger_path = get_cache_dir() / TASK_DEFINITIONS_LEDGER_FILENAME
+        tmp_ledger_path = ledger_path.with_suffix(".{}.tmp".format(os.getpid()))
+        with open(tmp_ledger_path, "w") as f:
+            json.dump(ledger, f)
+        os.replace(tmp_ledger_path, ledger_path)
+    except OSError:
+        pass
+
+
+def _is_task_definition_active(task_definition_arn, ecs_client):
+    try:
+        response = ecs_client.describe_task_definition(
+            taskDefinition=task_definition_arn
+        )
+    except ClientError:
+        return False
+    return response["taskDefinition"]["status"] == "ACTIVE"
+
+
 def register_new_task_definition(task_definition_name, images, region, ecs_client=None):
+    """
+    Registers new revision of the task definition with the images and returns its ARN. The task definition is not
+    registered if it is the same as the current revision or a revision registered before (registered revisions are
+    stored in the local ledger), ARN of the existing revision is returned instead.
+    """
     try:
         images_data = json.loads(images)
     except json.JSONDecodeError as ex:
@@ -64,14 +678,23 @@ def register_new_task_definition(task_definition_name, images, region, ecs_clien
     except ClientError as ex:
         raise ClickException(ex)
 
+    old_task_definition_arn = old_task_definition["taskDefinition"]["taskDefinitionArn"]
     LOGGER.info("Images: %s", images_data)
-    LOGGER.info(
-        "Old task definition ARN: %s",
-        old_task_definition["taskDefinition"]["taskDefinitionArn"],
+    LOGGER.info("Old task definition ARN: %s", old_task_definition_arn)
+
+    old_task_definition_hash = _get_task_definition_hash(
+        _get_task_definition_payload(old_task_definition), region
     )
+    ledger = _load_task_definitions_ledger()
+    if ledger.get(old_task_definition_hash) != old_task_definition_arn:
+        _save_to_task_definitions_ledger(
+            old_task_definition_hash, old_task_definition_arn
+        )
 
-    definition = old_task_definition["taskDefinition"]
-    for container_definition in definition["containerDefinitions"]:
+    new_task_definition = _get_task_definition_payload(
+        copy.deepcopy(old_task_definition)
+    )
+    for container_definition in new_task_definition["containerDefinitions"]:
         try:
             container_definition["image"] = images_data[container_definition["name"]]
         except KeyError as ex:
@@ -81,21 +704,22 @@ def register_new_task_definition(task_definition_name, images, region, ecs_clien
                 container_definition["name"],
             )
 
-    new_task_definition = {
-        "containerDefinitions": definition["containerDefinitions"],
-        "executionRoleArn": definition["executionRoleArn"],
-        "family": definition["family"],
-        "networkMode": definition["networkMode"],
-        "requiresCompatibilities": definition["requiresCompatibilities"],
-        "tags": old_task_definition["tags"],
-        "taskRoleArn": definition["taskRoleArn"],
-        "volumes": definition["volumes"],
-    }
-
-    if "cpu" in definition:
-        new_task_definition["cpu"] = definition["cpu"]
-    if "memory" in definition:
-        new_task_definition["memory"] = definition["memory"]
+    new_task_definition_hash = _get_task_definition_hash(new_task_definition, region)
+    if new_task_definition_hash == old_task_definition_hash:
+        LOGGER.info(
+            "Task definition is not changed, using ARN: %s", old_task_definition_arn
+        )
+        return old_task_definition_arn
+
+    ledger_task_definition_arn = ledger.get(new_task_definition_hash)
+    if ledger_task_definition_arn and _is_task_definition_active(
+        ledger_task_definition_arn, ecs_client
+    ):
+        LOGGER.info(
+            "Task definition was already registered, using ARN: %s",
+            ledger_task_definition_arn,
+        )
+        return ledger_task_definition_arn
 
     try:
         response = ecs_client.register_task_definition(**new_task_definition)
@@ -104,42 +728,40 @@ def register_new_task_definition(task_definition_name, images, region, ecs_clien
 
     new_task_definition_arn = response["taskDefinition"]["taskDefinitionArn"]
     LOGGER.info("New task definition ARN: %s", new_task_definition_arn)
+    _save_to_task_definitions_ledger(new_task_definition_hash, new_task_definition_arn)
 
     return new_task_definition_arn
 
 
-def get_task_definition_for_service(cluster, service, region, ecs_client=None):
+def get_task_definition_for_service(
+    cluster, service, region, ecs_client=None, cache_ttl=None, services_cache=None
+):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
-    try:
-        services = ecs_client.describe_services(
-            cluster=cluster,
-            services=[service],
-        )
-    except ecs_client.exceptions.ClusterNotFoundException:
-        raise ClickException("Cluster not found: '{}'".format(cluster))
-    except ClientError as ex:
-        raise ClickException(ex)
-
-    number_of_services = len(services["services"])
-
-    if number_of_services > 1:
-        raise ClickException(
-            "More than one service with the same name found: {}".format(
-                len(services["services"])
-            )
-        )
-    elif number_of_services == 0:
-        raise ClickException("Service not found: '{}'".format(service))
+    snapshot = _get_snapshot(cluster, region, cache_ttl, ecs_client)
+    if snapshot is not None and service in snapshot["services"]:
+        return snapshot["services"][service]["taskDefinition"]
 
-    return services["services"][0]["taskDefinition"]
+    return get_service(
+        cluster=cluster,
+        service=service,
+        region=region,
+        ecs_client=ecs_client,
+        services_cache=services_cache,
+    )["taskDefinition"]
 
 
-def update_service_to_latest_task_definition(cluster, service, region, ecs_client=None):
+def update_service_to_latest_task_definition(
+    cluster, service, region, ecs_client=None, services_cache=None
+):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
     old_task_definition = get_task_definition_for_service(
-        cluster=cluster, service=service, region=region, ecs_client=ecs_client
+        cluster=cluster,
+        service=service,
+        region=region,
+        ecs_client=ecs_client,
+        services_cache=services_cache,
     )
     LOGGER.info("Current task definition ARN: {}".format(old_task_definition))
 
@@ -159,11 +781,18 @@ def update_service_to_latest_task_definition(cluster, service, region, ecs_clien
         task_definition=new_task_definition_arn,
         region=region,
         ecs_client=ecs_client,
+        services_cache=services_cache,
     )
 
 
 def update_service_to_new_task_definition(
-    cluster, service, task_definition, region, force=True, ecs_client=None
+    cluster,
+    service,
+    task_definition,
+    region,
+    force=True,
+    ecs_client=None,
+    services_cache=None,
 ):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
@@ -181,14 +810,22 @@ def update_service_to_new_task_definition(
     except ClientError as ex:
         raise ClickException(ex)
 
+    _invalidate_service(cluster, service, region, services_cache)
+
 
 def deploy_new_task_definition(
-    cluster, service, task_definition, images, region, ecs_client=None
+    cluster,
+    service,
+    task_definition,
+    images,
+    region,
+    ecs_client=None,
+    services_cache=None,
 ):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
     new_task_definition = register_new_task_definition(
-        task_definition=task_definition,
+        task_definition_name=task_definition,
         images=images,
         region=region,
         ecs_client=ecs_client,
@@ -200,10 +837,24 @@ def deploy_new_task_definition(
         task_definition=new_task_definition,
         region=region,
         ecs_client=ecs_client,
+        services_cache=services_cache,
     )
 
 
-def start_service(cluster, service, count, region, ecs_client=None, as_client=None):
+def start_service(
+    cluster,
+    service,
+    count,
+    region,
+    ecs_client=None,
+    as_client=None,
+    min_capacities=None,
+    services_cache=None,
+):
+    """
+    Starts the service with the count of tasks. Minimum capacity of the service scalable target is used if count is
+    None, it is taken from min_capacities dictionary (see get_min_capacities_for_services) if it is set.
+    """
     if count is not None and count < 1:
         raise ClickException(
             "Count must be greater than zero or 'None' to be determined from autoscaling targets."
@@ -212,16 +863,17 @@ def start_service(cluster, service, count, region, ecs_client=None, as_client=No
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
     if count is None:
-        try:
-            count = get_min_capacity_for_service(
-                cluster=cluster, service=service, region=region
+        if min_capacities is None:
+            min_capacities = get_min_capacities_for_services(
+                cluster=cluster, services=[service], region=region, as_client=as_client
             )
-        except ClickException as ex:
+        if service not in min_capacities:
             raise ClickException(
                 "Set explicit count or set up autoscaling with minimum capacity.\n{}".format(
-                    ex
+                    _get_no_scalable_target_message(cluster, service)
                 )
             )
+        count = min_capacities[service]
 
     LOGGER.info("Starting service: {} [count={}]".format(service, count))
 
@@ -238,51 +890,86 @@ def start_service(cluster, service, count, region, ecs_client=None, as_client=No
     except ClientError as ex:
         raise ClickException(ex)
 
+    _invalidate_service(cluster, service, region, services_cache)
+
 
-def start_services(cluster, services, count, region, ecs_client=None):
+def start_services(
+    cluster,
+    services,
+    count,
+    region,
+    ecs_client=None,
+    parallelism=DEFAULT_PARALLELISM,
+    min_capacities=None,
+    services_cache=None,
+):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
-    for service in services:
-        start_service(
-            cluster=cluster,
-            service=service,
-            count=count,
-            region=region,
-            ecs_client=ecs_client,
+    if count is None and min_capacities is None:
+        # Minimum capacities of all services are loaded with a few batched calls before the services are started
+        min_capacities = get_min_capacities_for_services(
+            cluster=cluster, services=services, region=region
+        )
+
+    with _batch_snapshot_invalidation(cluster, region):
+        run_for_services(
+            "start",
+            lambda service: start_service(
+                cluster=cluster,
+                service=service,
+                count=count,
+                region=region,
+                ecs_client=ecs_client,
+                min_capacities=min_capacities,
+                services_cache=services_cache,
+            ),
+            services,
+            parallelism,
         )
 
 
-def is_service_type(service, cluster, type, region, ecs_client=None):
-    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+def is_service_type(
+    service, cluster, type, region, ecs_client=None, services_cache=None
+):
     return (
-        ecs_client.describe_services(services=[service], cluster=cluster)["services"][
-            0
-        ]["schedulingStrategy"]
+        get_service(
+            cluster=cluster,
+            service=service,
+            region=region,
+            ecs_client=ecs_client,
+            services_cache=services_cache,
+        )["schedulingStrategy"]
         == type
     )
 
 
-def is_service_type_daemon(service, cluster, region, ecs_client=None):
+def is_service_type_daemon(
+    service, cluster, region, ecs_client=None, services_cache=None
+):
     return is_service_type(
         service=service,
         cluster=cluster,
         type="DAEMON",
         region=region,
         ecs_client=ecs_client,
+        services_cache=services_cache,
     )
 
 
-def start_cluster_services(cluster, count, region, ecs_client=None):
+def start_cluster_services(
+    cluster,
+    count,
+    region,
+    ecs_client=None,
+    parallelism=DEFAULT_PARALLELISM,
+    services_cache=None,
+):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+    services_cache = services_cache if services_cache is not None else ServicesCache()
 
-    services = get_services_names(cluster=cluster, region=region, ecs_client=ecs_client)
-    non_daemon_services = [
-        service
-        for service in services
-        if not is_service_type_daemon(
-            service=service, cluster=cluster, region=region, ecs_client=ecs_client
-        )
-    ]
+    non_daemon_services = _get_non_daemon_services(
+        cluster, region, ecs_client, services_cache
+    )
 
     start_services(
         cluster=cluster,
@@ -290,11 +977,120 @@ def start_cluster_services(cluster, count, region, ecs_client=None):
         count=count,
         region=region,
         ecs_client=ecs_client,
+        parallelism=parallelism,
+        services_cache=services_cache,
     )
 
 
-def stop_service(cluster, service, region, ecs_client=None):
-    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+def _get_start_waves(services, tiers, wave_size):
+    """
+    Returns list of waves (lists of services). Services are grouped by the tiers, services which are not in any tier
+    form the last tier. Tiers are split into waves of wave_size services.
+    """
+    tiers = tiers or []
+    unknown_services = [
+        service for tier in tiers for service in tier if service not in services
+    ]
+    if unknown_services:
+        LOGGER.warning(
+            "Services of the tiers are not non-daemon services of the cluster: {}".format(
+                ", ".join(unknown_services)
+            )
+        )
+
+    tiers = [[service for service in tier if service in services] for tier in tiers]
+    tiered_services = {service for tier in tiers for service in tier}
+    tiers.append([service for service in services if service not in tiered_services])
+
+    waves = []
+    # Tiers with only unknown services and the last tier may be empty
+    for tier in filter(None, tiers):
+        tier_wave_size = wave_size or len(tier)
+        waves += [
+            tier[i : i + tier_wave_size] for i in range(0, len(tier), tier_wave_size)
+        ]
+    return waves
+
+
+def start_cluster_services_in_waves(
+    cluster,
+    count,
+    region,
+    tiers=None,
+    wave_size=None,
+    ecs_client=None,
+    parallelism=DEFAULT_PARALLELISM,
+    timeout=DEFAULT_ROLLOUT_TIMEOUT,
+    max_failed_tasks=DEFAULT_MAX_FAILED_TASKS,
+    services_cache=None,
+):
+    """
+    Starts non-daemon services of the cluster in waves, the next wave is started when all services of the previous
+    wave are stable. Waves are formed from the tiers (lists of services, services which are not in any tier are
+    started last) split into waves of wave_size services. Time to running of every wave is reported.
+    """
+    if wave_size is not None and wave_size < 1:
+        raise ClickException("Wave size must be greater than zero.")
+
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+    services_cache = services_cache if services_cache is not None else ServicesCache()
+
+    services = _get_non_daemon_services(cluster, region, ecs_client, services_cache)
+    waves = _get_start_waves(services, tiers, wave_size)
+    min_capacities = (
+        get_min_capacities_for_services(
+            cluster=cluster, services=services, region=region
+        )
+        if count is None
+        else None
+    )
+
+    waves_durations = []
+    try:
+        for i, wave in enumerate(waves, start=1):
+            LOGGER.info(
+                "Starting wave {}/{}: {}".format(i, len(waves), ", ".join(wave))
+            )
+            start = time.perf_counter()
+            start_services(
+                cluster=cluster,
+                services=wave,
+                count=count,
+                region=region,
+                ecs_client=ecs_client,
+                parallelism=parallelism,
+                min_capacities=min_capacities,
+                services_cache=services_cache,
+            )
+            watch_rollout(
+                cluster=cluster,
+                services=wave,
+                region=region,
+                timeout=timeout,
+                max_failed_tasks=max_failed_tasks,
+                ecs_client=ecs_client,
+                services_cache=services_cache,
+            )
+            waves_durations.append(time.perf_counter() - start)
+            LOGGER.info(
+                "Wave {}/{} is running after {:.1f}s.".format(
+                    i, len(waves), waves_durations[-1]
+                )
+            )
+    finally:
+        LOGGER.info("Staged start report:")
+        for i, wave in enumerate(waves, start=1):
+            if i <= len(waves_durations):
+                result = "running after {:.1f}s".format(waves_durations[i - 1])
+            elif i == len(waves_durations) + 1:
+                result = "FAILED"
+            else:
+                result = "NOT STARTED"
+            LOGGER.info("  wave {} ({} services): {}".format(i, len(wave), result))
+
+
+def stop_service(cluster, service, region, ecs_client=None, services_cache=None):
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
     LOGGER.info("Stopping service: {}".format(service))
 
@@ -307,35 +1103,43 @@ def stop_service(cluster, service, region, ecs_client=None):
     except ClientError as ex:
         raise ClickException(ex)
 
+    _invalidate_service(cluster, service, region, services_cache)
 
-def stop_cluster_services(cluster, region):
-    ecs_client = _get_ecs_client(region)
 
-    try:
-        cluster_services = get_services_arns(
-            cluster=cluster, region=region, ecs_client=ecs_client
-        )
-    except ecs_client.exceptions.ClusterNotFoundException:
-        raise ClickException("Cluster not found: '{}'".format(cluster))
-    except ClientError as ex:
-        raise ClickException(ex)
+def stop_cluster_services(
+    cluster, region, parallelism=DEFAULT_PARALLELISM, services_cache=None
+):
+    ecs_client = _get_ecs_client(region)
+    services_cache = services_cache if services_cache is not None else ServicesCache()
 
-    non_daemon_services = [
-        service
-        for service in cluster_services
-        if not is_service_type_daemon(
-            service=service, cluster=cluster, region=region, ecs_client=ecs_client
-        )
-    ]
+    non_daemon_services = _get_non_daemon_services(
+        cluster, region, ecs_client, services_cache
+    )
 
-    for service in non_daemon_services:
-        stop_service(
-            cluster=cluster, service=service, region=region, ecs_client=ecs_client
+    with _batch_snapshot_invalidation(cluster, region):
+        run_for_services(
+            "stop",
+            lambda service: stop_service(
+                cluster=cluster,
+                service=service,
+                region=region,
+                ecs_client=ecs_client,
+                services_cache=services_cache,
+            ),
+            non_daemon_services,
+            parallelism,
         )
 
 
 def run_task(
-    cluster, task_definition, command, name, region, ecs_client=None, **kwargs
+    cluster,
+    task_definition,
+    command,
+    name,
+    region,
+    ecs_client=None,
+    environment=None,
+    **kwargs
 ):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
@@ -345,36 +1149,24 @@ def run_task(
         "count": 1,
     }
 
+    container_override = {"name": name}
     if command is not None:
-        args["overrides"] = {
-            "containerOverrides": [
-                {"name": name, "command": [command]},
-            ],
-        }
+        container_override["command"] = [command]
+    if environment:
+        container_override["environment"] = [
+            {"name": key, "value": str(value)} for key, value in environment.items()
+        ]
+    if kwargs.get("environmentFiles") is not None:
+        container_override["environmentFiles"] = [
+            {"type": "s3", "value": kwargs.get("environmentFiles")}
+        ]
+    if len(container_override) > 1:
+        args["overrides"] = {"containerOverrides": [container_override]}
 
     for key, value in kwargs.items():
         if key != "environmentFiles" and value is not None:
             args[key] = value
 
-    if kwargs.get("environmentFiles") is not None:
-        if "overrides" in args:
-            if "containerOverrides" in args["overrides"]:
-                args["overrides"]["containerOverrides"][0]["environmentFiles"] = [
-                    {"type": "s3", "value": kwargs.get("environmentFiles")}
-                ]
-
-        else:
-            args["overrides"] = {
-                "containerOverrides": [
-                    {
-                        "name": name,
-                        "environmentFiles": [
-                            {"type": "s3", "value": kwargs.get("environmentFiles")}
-                        ],
-                    },
-                ],
-            }
-
     try:
         resp = ecs_client.run_task(**args)
     except ecs_client.exceptions.ClusterNotFoundException:
@@ -382,81 +1174,155 @@ def run_task(
     except ClientError as ex:
         raise ClickException(ex)
 
+    if not resp["tasks"]:
+        raise ClickException(
+            "Task was not started: {}".format(
+                ", ".join(
+                    failure.get("reason", "UNDEFINED") for failure in resp["failures"]
+                )
+            )
+        )
     return resp["tasks"][0]["taskArn"]
 
 
-def wait_for_task_to_stop(cluster, task, timeout, region, ecs_client=None):
+def _describe_tasks_status(cluster, tasks, ecs_client):
+    """
+    Returns dictionary of tasks ARNs and their descriptions, tasks are described in chunks of 100 tasks. Not existing
+    tasks have None description.
+    """
+    tasks_descriptions = {}
+    for i in range(0, len(tasks), DESCRIBE_TASKS_CHUNK_SIZE):
+        response = ecs_client.describe_tasks(
+            cluster=cluster, tasks=tasks[i : i + DESCRIBE_TASKS_CHUNK_SIZE]
+        )
+        for task in response["tasks"]:
+            tasks_descriptions[task["taskArn"]] = task
+        for failure in response["failures"]:
+            tasks_descriptions[failure["arn"]] = None
+    return tasks_descriptions
+
+
+def wait_for_tasks_status(cluster, tasks, status, timeout, region, ecs_client=None):
+    """
+    Waits until all tasks reach the status (RUNNING or STOPPED). All tasks are polled together with describe_tasks
+    calls of up to 100 tasks and the tasks which reached the status are not polled anymore. The delay between polls
+    grows while no task changes its state or the API is throttled. Timeout is one deadline for all tasks.
+    """
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
-    waiter = ecs_client.get_waiter("tasks_stopped")
 
+    if not tasks:
+        return
+
+    # Last seen status of the tasks which did not reach the required status
+    pending_tasks = dict.fromkeys(tasks)
+
+    def check():
+        try:
+            tasks_descriptions = _describe_tasks_status(
+                cluster, list(pending_tasks), ecs_client
+            )
+        except ecs_client.exceptions.ClusterNotFoundException:
+            raise ClickException("Cluster not found: '{}'".format(cluster))
+        except ClientError as ex:
+            raise ClickException(ex)
+
+        changed = False
+        for task, task_description in tasks_descriptions.items():
+            if task_description is None:
+                # Stopped tasks are removed after some time and new tasks may not be visible immediately
+                last_status = "STOPPED" if status == "STOPPED" else "MISSING"
+            else:
+                last_status = task_description["lastStatus"]
+
+            if last_status == status:
+                LOGGER.info("Task '{}' reached status {}.".format(task, status))
+                del pending_tasks[task]
+                changed = True
+            elif last_status == "STOPPED":
+                raise ClickException(
+                    "Task '{}' stopped: {}".format(
+                        task, task_description.get("stoppedReason", "UNDEFINED")
+                    )
+                )
+            elif pending_tasks[task] != last_status:
+                pending_tasks[task] = last_status
+                changed = True
+        return not pending_tasks, changed
+
+    poll_until(
+        "waiting for tasks status {}".format(status),
+        check,
+        timeout,
+        TASKS_POLL_MIN_DELAY,
+        TASKS_POLL_MAX_DELAY,
+        timeout_message=lambda: "tasks did not reach status {}: {}".format(
+            status,
+            ", ".join(
+                "{} ({})".format(task, last_status or "UNKNOWN")
+                for task, last_status in pending_tasks.items()
+            ),
+        ),
+    )
+
+
+def wait_for_task_to_stop(cluster, task, timeout, region, ecs_client=None):
     LOGGER.info("Waiting for task '{}' to stop.".format(task))
 
-    try:
-        waiter.wait(
-            cluster=cluster,
-            tasks=[task],
-            WaiterConfig={
-                "Delay": 1,
-                "MaxAttempts": timeout,
-            },
-        )
-    except ecs_client.exceptions.ClusterNotFoundException:
-        raise ClickException("Cluster not found: '{}'".format(cluster))
-    except (ClientError, WaiterError) as ex:
-        raise ClickException(ex)
+    wait_for_tasks_status(
+        cluster=cluster,
+        tasks=[task],
+        status="STOPPED",
+        timeout=timeout,
+        region=region,
+        ecs_client=ecs_client,
+    )
 
     LOGGER.info("Task '{}' stopped.".format(task))
 
 
 def wait_for_tasks_to_stop(cluster, tasks, timeout, region, ecs_client=None):
-    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
-    waiter = ecs_client.get_waiter("tasks_stopped")
-
     LOGGER.info("Waiting for tasks {} to stop.".format(tasks))
 
-    try:
-        waiter.wait(
-            cluster=cluster,
-            tasks=tasks,
-            WaiterConfig={
-                "Delay": 1,
-                "MaxAttempts": timeout,
-            },
-        )
-    except ecs_client.exceptions.ClusterNotFoundException:
-        raise ClickException("Cluster not found: '{}'".format(cluster))
-    except (ClientError, WaiterError) as ex:
-        raise ClickException(ex)
+    wait_for_tasks_status(
+        cluster=cluster,
+        tasks=tasks,
+        status="STOPPED",
+        timeout=timeout,
+        region=region,
+        ecs_client=ecs_client,
+    )
 
     LOGGER.info("All tasks stopped.")
 
 
-def wait_for_task_to_start(cluster, task, region, ecs_client=None):
-    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
-    waiter = ecs_client.get_waiter("tasks_running")
-
+def wait_for_task_to_start(
+    cluster, task, region, ecs_client=None, timeout=DEFAULT_TASKS_START_TIMEOUT
+):
     LOGGER.info("Waiting for task {} to start.".format(task))
 
-    try:
-        waiter.wait(cluster=cluster, tasks=[task])
-    except ecs_client.exceptions.ClusterNotFoundException:
-        raise ClickException("Cluster not found: '{}'".format(cluster))
-    except (ClientError, WaiterError) as ex:
-        raise ClickException(ex)
-
+    wait_for_tasks_status(
+        cluster=cluster,
+        tasks=[task],
+        status="RUNNING",
+        timeout=timeout,
+        region=region,
+        ecs_client=ecs_client,
+    )
 
-def wait_for_tasks_to_start(cluster, tasks, region, ecs_client=None):
-    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
-    waiter = ecs_client.get_waiter("tasks_running")
 
+def wait_for_tasks_to_start(
+    cluster, tasks, region, ecs_client=None, timeout=DEFAULT_TASKS_START_TIMEOUT
+):
     LOGGER.info("Waiting for tasks {} to start.".format(tasks))
 
-    try:
-        waiter.wait(cluster=cluster, tasks=tasks)
-    except ecs_client.exceptions.ClusterNotFoundException:
-        raise ClickException("Cluster not found: '{}'".format(cluster))
-    except (ClientError, WaiterError) as ex:
-        raise ClickException(ex)
+    wait_for_tasks_status(
+        cluster=cluster,
+        tasks=tasks,
+        status="RUNNING",
+        timeout=timeout,
+        region=region,
+        ecs_client=ecs_client,
+    )
 
 
 def run_service_task(
@@ -468,6 +1334,7 @@ def run_service_task(
     region,
     container=None,
     ecs_client=None,
+    container_logs=None,
     **kwargs
 ):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
@@ -509,6 +1376,7 @@ def run_service_task(
         timeout=timeout,
         region=region,
         ecs_client=ecs_client,
+        container_logs=container_logs,
         **kwargs,
     )
 
@@ -522,10 +1390,20 @@ def run_task_and_wait_for_success(
     timeout,
     region,
     ecs_client=None,
+    container_logs=None,
     **kwargs
 ):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
+    # Log configuration is loaded before the task is started, so the started task is always waited for
+    try:
+        task_definition_description = ecs_client.describe_task_definition(
+            taskDefinition=task_definition
+        )["taskDefinition"]
+    except ClientError as ex:
+        LOGGER.info("Task output cannot be shown: {}".format(ex))
+        task_definition_description = None
+
     try:
         task = run_task(
             cluster=cluster,
@@ -544,13 +1422,57 @@ def run_task_and_wait_for_success(
     task_id = task.split("/")[-1]
 
     LOGGER.info("Running task: '{}'".format(task))
-    wait_for_task_to_stop(
-        cluster=cluster,
-        task=task,
-        timeout=timeout,
-        region=region,
-        ecs_client=ecs_client,
+    LOGGER.info("Task output:")
+
+    log_streams = (
+        [
+            log_stream
+            for log_stream in _get_log_streams(
+                task_definition_description, task_id, region
+            )
+            if container_logs is None or log_stream[0] in container_logs
+        ]
+        if task_definition_description is not None
+        else []
+    )
+
+    def log_event(container_name, event):
+        LOGGER.info(
+            2 * " "
+            + "[task/{}/{} - {}] {}".format(
+                task_id,
+                container_name,
+                datetime.fromtimestamp(event["timestamp"] // 1000),
+                event["message"].rstrip(),
+            )
+        )
+
+    def tail_task_log():
+        try:
+            tail_log_streams(log_streams, log_event, task_stopped)
+        except Exception as ex:
+            LOGGER.info(ex)
+
+    # Task output is logged while the task is running
+    task_stopped = threading.Event()
+    log_tailer = threading.Thread(
+        target=_in_current_context(tail_task_log), daemon=True
     )
+    if log_streams:
+        log_tailer.start()
+    try:
+        wait_for_task_to_stop(
+            cluster=cluster,
+            task=task,
+            timeout=timeout,
+            region=region,
+            ecs_client=ecs_client,
+        )
+    finally:
+        task_stopped.set()
+        if log_tailer.is_alive():
+            log_tailer.join()
+
     response = ecs_client.describe_tasks(cluster=cluster, tasks=[task])
 
     UNDEFINED = "UNDEFINED"
@@ -577,24 +1499,6 @@ def run_task_and_wait_for_success(
 
         raise ClickException(response["tasks"][0])
 
-    try:
-        LOGGER.info("Task output:")
-        for event in get_log_events(
-            log_group=task_definition,
-            log_stream="ecs/{}/{}".format(name, task_id),
-            region=region,
-        ):
-            LOGGER.info(
-                2 * " "
-                + "[task/{} - {}] {}".format(
-                    task_id,
-                    datetime.fromtimestamp(event["timestamp"] // 1000),
-                    event["message"].rstrip(),
-                )
-            )
-    except Exception as ex:
-        LOGGER.info(ex)
-
     exit_code = container_response.get("exitCode", UNDEFINED)
     LOGGER.info("Container exit code: '{}'".format(exit_code))
 
@@ -611,60 +1515,571 @@ def run_task_and_wait_for_success(
     LOGGER.info("Success")
 
 
-def get_services_arns(cluster, region, ecs_client=None):
+def run_tasks(
+    cluster,
+    task_definition,
+    command,
+    name,
+    shards,
+    success_string,
+    timeout,
+    region,
+    ecs_client=None,
+    container_logs=None,
+    parallelism=DEFAULT_PARALLELISM,
+    **kwargs
+):
+    """
+    Runs one task for every shard and waits for all of them to stop with success. Containers get the shard index and the
+    number of shards in SHARD_INDEX and SHARD_COUNT environment variables. Tasks are started concurrently (at most
+    parallelism tasks at once), logs of all tasks are shown together and the result of every shard is reported.
+    """
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
+    if shards < 1:
+        raise ClickException("Number of shards must be greater than zero.")
+
     try:
-        resp = ecs_client.list_services(cluster=cluster, maxResults=100)
-    except ecs_client.exceptions.ClusterNotFoundException:
-        raise ClickException("Cluster not found: '{}'".format(cluster))
+        task_definition_description = ecs_client.describe_task_definition(
+            taskDefinition=task_definition
+        )["taskDefinition"]
     except ClientError as ex:
         raise ClickException(ex)
 
-    if "nextToken" in resp:
-        raise ClickException(
-            "Getting ARNs of more than 100 cluster services is not implemented"
+    def run_shard_task(shard):
+        return run_task(
+            cluster=cluster,
+            task_definition=task_definition,
+            command=command,
+            name=name,
+            region=region,
+            ecs_client=ecs_client,
+            environment={SHARD_INDEX_VARIABLE: shard, SHARD_COUNT_VARIABLE: shards},
+            **kwargs,
         )
 
-    services_arns = resp["serviceArns"]
-    return services_arns
+    # Every task has its own overrides, so the tasks cannot be started with one run_task call with count. Shards which
+    # failed to start do not stop the others, the started tasks are always waited for and reported
+    shards_tasks, not_started_shards = _call_for_services(
+        "start of shard tasks",
+        run_shard_task,
+        [str(shard) for shard in range(shards)],
+        parallelism,
+    )
+    if not shards_tasks:
+        raise ClickException("No shard task was started.")
+
+    log_streams = [
+        ((shard, container_name), log_group, log_stream, log_region)
+        for shard, task in shards_tasks.items()
+        for container_name, log_group, log_stream, log_region in _get_log_streams(
+            task_definition_description, task.split("/")[-1], region
+        )
+        if container_logs is None or container_name in container_logs
+    ]
 
+    def log_event(stream_name, event):
+        shard, container_name = stream_name
+        LOGGER.info(
+            2 * " "
+            + "[shard/{}/{} - {}] {}".format(
+                shard,
+                container_name,
+                datetime.fromtimestamp(event["timestamp"] // 1000),
+                event["message"].rstrip(),
+            )
+        )
 
-def get_services_names(cluster, region, ecs_client=None):
-    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+    def tail_tasks_log():
+        try:
+            tail_log_streams(log_streams, log_event, tasks_stopped)
+        except Exception as ex:
+            LOGGER.info(ex)
 
-    services_arns = get_services_arns(cluster, region, ecs_client=ecs_client)
-    services_names = [service.split("/")[-1] for service in services_arns]
-    return services_names
+    tasks_stopped = threading.Event()
+    log_tailer = threading.Thread(
+        target=_in_current_context(tail_tasks_log), daemon=True
+    )
+    if log_streams:
+        log_tailer.start()
+    wait_error = None
+    try:
+        wait_for_tasks_to_stop(
+            cluster=cluster,
+            tasks=list(shards_tasks.values()),
+            timeout=timeout,
+            region=region,
+            ecs_client=ecs_client,
+        )
+    except ClickException as ex:
+        wait_error = ex.format_message()
+    finally:
+        tasks_stopped.set()
+        if log_tailer.is_alive():
+            log_tailer.join()
+
+    tasks_descriptions = _describe_tasks_status(
+        cluster, list(shards_tasks.values()), ecs_client
+    )
 
+    LOGGER.info("Shards report:")
+    failed_shards = []
+    for shard in map(str, range(shards)):
+        if shard in not_started_shards:
+            LOGGER.info(
+                "  shard {}: FAILED (not started: {})".format(
+                    shard, not_started_shards[shard]
+                )
+            )
+            continue
 
-def get_tasks_for_service(cluster, service, region, ecs_client=None):
-    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+        task = shards_tasks[shard]
+        task_description = tasks_descriptions.get(task) or {}
+        container_response = next(
+            (
+                container_response
+                for container_response in task_description.get("containers", [])
+                if container_response["name"] == name
+            ),
+            {},
+        )
+        exit_code = container_response.get("exitCode")
+        if exit_code is not None and str(exit_code) == success_string:
+            result = "OK (exit code {})".format(exit_code)
+        else:
+            failed_shards.append(shard)
+            result = "FAILED ({})".format(
+                "exit code {}".format(exit_code)
+                if exit_code is not None
+                else container_response.get("reason")
+                or task_description.get("stoppedReason", "UNDEFINED")
+            )
+
+        started_at = task_description.get("startedAt") or task_description.get(
+            "createdAt"
+        )
+        stopped_at = task_description.get("stoppedAt")
+        LOGGER.info(
+            "  shard {} ({}): {}{}".format(
+                shard,
+                task.split("/")[-1],
+                result,
+                (
+                    " [{:.1f}s]".format((stopped_at - started_at).total_seconds())
+                    if started_at and stopped_at
+                    else ""
+                ),
+            )
+        )
+
+    errors = [wait_error] if wait_error else []
+    if not_started_shards:
+        errors.append(
+            "{} of {} shards were not started: {}".format(
+                len(not_started_shards), shards, ", ".join(not_started_shards)
+            )
+        )
+    if failed_shards:
+        errors.append(
+            "{} of {} shards failed: {}".format(
+                len(failed_shards), shards, ", ".join(failed_shards)
+            )
+        )
+    if errors:
+        raise ClickException("; ".join(errors))
+    LOGGER.info("Success")
 
+
+def _prefetch_pages(pages):
+    """
+    Yields pages of the paginator, the next page is fetched in the background while the current page is processed.
+    """
+    pages = iter(pages)
+    fetch_page = _in_current_context(next)
+    with ThreadPool(1) as pool:
+        next_page = pool.apply_async(fetch_page, (pages, None))
+        while True:
+            page = next_page.get()
+            if page is None:
+                return
+            next_page = pool.apply_async(fetch_page, (pages, None))
+            yield page
+
+
+def _iter_paginated(ecs_client, operation_name, result_key, **kwargs):
+    paginator = ecs_client.get_paginator(operation_name)
     try:
-        resp = ecs_client.list_tasks(cluster=cluster, serviceName=service)
+        for page in _prefetch_pages(paginator.paginate(**kwargs)):
+            yield from page[result_key]
     except ecs_client.exceptions.ClusterNotFoundException:
-        raise ClickException("Cluster not found: '{}'".format(cluster))
+        raise ClickException("Cluster not found: '{}'".format(kwargs["cluster"]))
     except ecs_client.exceptions.ServiceNotFoundException:
-        raise ClickException("Service not found: '{}'".format(service))
+        raise ClickException("Service not found: '{}'".format(kwargs["serviceName"]))
     except ClientError as ex:
         raise ClickException(ex)
 
-    tasks_arns = resp["taskArns"]
-    return tasks_arns
+
+def iter_services_arns(cluster, region, ecs_client=None):
+    """
+    Yields ARNs of all cluster services, the services are listed page by page.
+    """
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+    return _iter_paginated(
+        ecs_client,
+        "list_services",
+        "serviceArns",
+        cluster=cluster,
+        PaginationConfig={"PageSize": 100},
+    )
 
 
-def stop_services_and_wait_for_tasks_to_stop(
-    cluster, services, timeout, region, ecs_client=None
+def iter_tasks_arns(
+    cluster,
+    region,
+    service=None,
+    desired_status=None,
+    family=None,
+    ecs_client=None,
+):
+    """
+    Yields ARNs of the cluster tasks filtered by the service, desired status (RUNNING by default) and task definition
+    family, the tasks are listed page by page.
+    """
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+
+    kwargs = {}
+    if service is not None:
+        kwargs["serviceName"] = service
+    if desired_status is not None:
+        kwargs["desiredStatus"] = desired_status
+    if family is not None:
+        kwargs["family"] = family
+    return _iter_paginated(
+        ecs_client,
+        "list_tasks",
+        "taskArns",
+        cluster=cluster,
+        PaginationConfig={"PageSize": 100},
+        **kwargs,
+    )
+
+
+def iter_task_definitions_arns(
+    region, family_prefix=None, status=None, sort=None, ecs_client=None
 ):
+    """
+    Yields ARNs of the task definitions filtered by the family prefix and status (ACTIVE by default), the task
+    definitions are listed page by page.
+    """
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
-    THREAD_MAX = 32
-    number_of_services = len(services)
+    kwargs = {}
+    if family_prefix is not None:
+        kwargs["familyPrefix"] = family_prefix
+    if status is not None:
+        kwargs["status"] = status
+    if sort is not None:
+        kwargs["sort"] = sort
+    return _iter_paginated(
+        ecs_client,
+        "list_task_definitions",
+        "taskDefinitionArns",
+        PaginationConfig={"PageSize": 100},
+        **kwargs,
+    )
+
+
+def get_services_arns(cluster, region, ecs_client=None):
+    return list(iter_services_arns(cluster, region, ecs_client=ecs_client))
+
+
+def iter_services_names(cluster, region, ecs_client=None):
+    for service_arn in iter_services_arns(cluster, region, ecs_client=ecs_client):
+        yield _get_service_name(service_arn)
+
+
+def get_services_names(cluster, region, ecs_client=None, cache_ttl=None):
+    snapshot = _get_snapshot(cluster, region, cache_ttl, ecs_client)
+    if snapshot is not None:
+        return list(snapshot["services_names"])
+
+    return list(iter_services_names(cluster, region, ecs_client=ecs_client))
+
+
+def get_tasks_for_service(cluster, service, region, ecs_client=None, cache_ttl=None):
+    snapshot = _get_snapshot(cluster, region, cache_ttl, ecs_client)
+    if snapshot is not None and service in snapshot["tasks"]:
+        return list(snapshot["tasks"][service])
+
+    return list(
+        iter_tasks_arns(cluster, region, service=service, ecs_client=ecs_client)
+    )
+
+
+_snapshots_lock = threading.Lock()
+_accounts = {}
+_accounts_lock = threading.Lock()
+
+
+def _get_account_id(region):
+    """
+    Returns ID of the AWS account of the current credentials. Account IDs are stored in the cache directory by the
+    hash of the access key, so STS is called only once for every access key.
+    """
+    credentials = _get_session().get_credentials()
+    if credentials is None:
+        raise ClickException("Unable to locate AWS credentials.")
+    access_key_hash = hashlib.sha256(credentials.access_key.encode()).hexdigest()
+
+    with _accounts_lock:
+        if access_key_hash in _accounts:
+            return _accounts[access_key_hash]
+
+        accounts_path = get_cache_dir() / ACCOUNTS_FILENAME
+        try:
+            with open(accounts_path) as f:
+                _accounts.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+        if access_key_hash not in _accounts:
+            try:
+                _accounts[access_key_hash] = _get_client(
+                    "sts", region
+                ).get_caller_identity()["Account"]
+            except ClientError as ex:
+                raise ClickException(ex)
+            try:
+                tmp_accounts_path = accounts_path.with_suffix(
+                    ".{}.tmp".format(os.getpid())
+                )
+                with open(tmp_accounts_path, "w") as f:
+                    json.dump(_accounts, f)
+                os.replace(tmp_accounts_path, accounts_path)
+            except OSError:
+                pass
+        return _accounts[access_key_hash]
+
+
+def _get_snapshot_path(cluster, region):
+    # Clusters with the same name may exist in more accounts
+    return get_cache_dir() / SNAPSHOT_FILENAME.format(
+        _get_account_id(region), region, cluster.split("/")[-1]
+    )
+
+
+def _load_snapshot(cluster, region):
+    try:
+        with open(_get_snapshot_path(cluster, region)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_snapshot(cluster, region, snapshot):
+    try:
+        snapshot_path = _get_snapshot_path(cluster, region)
+        tmp_snapshot_path = snapshot_path.with_suffix(
+            ".{}.{}.tmp".format(os.getpid(), threading.get_ident())
+        )
+        with open(tmp_snapshot_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_snapshot_path, snapshot_path)
+    except OSError:
+        pass
+
+
+_snapshot_invalidation_batches = {}
+_snapshot_invalidation_batches_lock = threading.Lock()
+
+
+def _invalidate_snapshot_services(cluster, services, region):
+    """
+    Removes the services metadata and tasks from the cluster snapshot, they are loaded from AWS API again.
+    """
+    # Account ID is not needed if the cluster has no snapshot in any account
+    if not services or not any(
+        get_cache_dir().glob(
+            SNAPSHOT_FILENAME.format("*", region, cluster.split("/")[-1])
+        )
+    ):
+        return
+    if not _get_snapshot_path(cluster, region).exists():
+        return
+
+    with _snapshots_lock:
+        snapshot = _load_snapshot(cluster, region)
+        if snapshot is None:
+            return
+        removed = [
+            snapshot[key].pop(_get_service_name(service), None) is not None
+            for service in services
+            for key in ("services", "tasks")
+        ]
+        if any(removed):
+            _save_snapshot(cluster, region, snapshot)
+
+
+def _invalidate_snapshot_service(cluster, service, region):
+    """
+    Removes the service from the cluster snapshot. Inside _batch_snapshot_invalidation the service is removed when the
+    batch ends.
+    """
+    with _snapshot_invalidation_batches_lock:
+        batch = _snapshot_invalidation_batches.get((region, cluster))
+        if batch is not None:
+            batch["services"].add(_get_service_name(service))
+            return
+    _invalidate_snapshot_services(cluster, [service], region)
+
+
+@contextmanager
+def _batch_snapshot_invalidation(cluster, region):
+    """
+    Collects services which are updated inside the block and removes all of them from the cluster snapshot at the end,
+    so the snapshot is loaded and saved only once for the whole batch of updates.
+    """
+    with _snapshot_invalidation_batches_lock:
+        batch = _snapshot_invalidation_batches.setdefault(
+            (region, cluster), {"depth": 0, "services": set()}
+        )
+        batch["depth"] += 1
+    try:
+        yield
+    finally:
+        with _snapshot_invalidation_batches_lock:
+            batch["depth"] -= 1
+            if batch["depth"] == 0:
+                del _snapshot_invalidation_batches[(region, cluster)]
+        if batch["depth"] == 0:
+            _invalidate_snapshot_services(cluster, batch["services"], region)
+
+
+def _describe_cluster_scalable_targets(cluster, region, as_client):
+    cluster_resource_prefix = "service/{}/".format(cluster.split("/")[-1])
+    paginator = as_client.get_paginator("describe_scalable_targets")
+    try:
+        return {
+            target["ResourceId"][len(cluster_resource_prefix) :]: {
+                "MinCapacity": target["MinCapacity"],
+                "MaxCapacity": target["MaxCapacity"],
+            }
+            for page in paginator.paginate(ServiceNamespace="ecs")
+            for target in page["ScalableTargets"]
+            if target["ResourceId"].startswith(cluster_resource_prefix)
+            and target["ScalableDimension"] == "ecs:service:DesiredCount"
+        }
+    except ClientError as ex:
+        raise ClickException(ex)
+
+
+def _describe_cluster_running_tasks(cluster, region, ecs_client):
+    tasks_arns = list(iter_tasks_arns(cluster, region, ecs_client=ecs_client))
+    try:
+        tasks_descriptions = _describe_tasks_status(cluster, tasks_arns, ecs_client)
+    except ClientError as ex:
+        raise ClickException(ex)
+
+    services_tasks = {}
+    for task_arn, task_description in tasks_descriptions.items():
+        # Group of the service tasks has format "service:<service name>"
+        group = (task_description or {}).get("group", "")
+        if group.startswith("service:"):
+            services_tasks.setdefault(group[len("service:") :], []).append(task_arn)
+    return services_tasks
+
+
+def take_snapshot(cluster, region, ecs_client=None, as_client=None):
+    """
+    Collects services, their task definitions, scaling targets and running tasks of the cluster, stores them to the
+    local snapshot and returns it. Tasks and scaling targets are loaded concurrently with the services, all
+    resources are described in batches.
+    """
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+    as_client = as_client if as_client else _get_autoscaling_client(region)
+
+    start = time.perf_counter()
+    with ThreadPool(2) as pool:
+        running_tasks = pool.apply_async(
+            _in_current_context(_describe_cluster_running_tasks),
+            (cluster, region, ecs_client),
+        )
+        scalable_targets = pool.apply_async(
+            _in_current_context(_describe_cluster_scalable_targets),
+            (cluster, region, as_client),
+        )
+        services_names = get_services_names(cluster, region, ecs_client=ecs_client)
+        services = describe_services(
+            cluster=cluster,
+            services=services_names,
+            region=region,
+            ecs_client=ecs_client,
+        )
+        running_tasks = running_tasks.get()
+        scalable_targets = scalable_targets.get()
+
+    snapshot = {
+        "created_at": time.time(),
+        "services_names": services_names,
+        "services": {
+            service_name: {
+                key: service[key]
+                for key in SNAPSHOT_SERVICE_ATTRIBUTES
+                if key in service
+            }
+            for service_name, service in services.items()
+        },
+        "tasks": {
+            service_name: running_tasks.get(service_name, [])
+            for service_name in services
+        },
+        "scalable_targets": {
+            service_name: scalable_targets[service_name]
+            for service_name in services
+            if service_name in scalable_targets
+        },
+    }
+    with _snapshots_lock:
+        _save_snapshot(cluster, region, snapshot)
+
+    LOGGER.info(
+        "Snapshot of cluster '{}' with {} services, {} running tasks and {} scaling targets taken in {:.1f}s.".format(
+            cluster,
+            len(snapshot["services"]),
+            sum(len(tasks) for tasks in snapshot["tasks"].values()),
+            len(snapshot["scalable_targets"]),
+            time.perf_counter() - start,
+        )
+    )
+    return snapshot
+
+
+def _get_snapshot(cluster, region, cache_ttl, ecs_client):
+    """
+    Returns snapshot of the cluster which is not older than cache_ttl seconds, new snapshot is taken if it does not
+    exist. None is returned if cache_ttl is None.
+    """
+    if cache_ttl is None:
+        return None
 
-    all_running_service_tasks = []
+    with _snapshots_lock:
+        snapshot = _load_snapshot(cluster, region)
+    if snapshot is None or time.time() - snapshot["created_at"] > cache_ttl:
+        snapshot = take_snapshot(cluster, region, ecs_client=ecs_client)
+    return snapshot
+
+
+def stop_services_and_wait_for_tasks_to_stop(
+    cluster,
+    services,
+    timeout,
+    region,
+    ecs_client=None,
+    parallelism=DEFAULT_PARALLELISM,
+    services_cache=None,
+):
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
-    for service in services:
+    def stop(service):
         running_service_tasks = get_tasks_for_service(
             cluster=cluster,
             service=service,
@@ -673,30 +2088,37 @@ def stop_services_and_wait_for_tasks_to_stop(
         )
 
         if running_service_tasks:
-            all_running_service_tasks += running_service_tasks
             stop_service(
-                cluster=cluster, service=service, region=region, ecs_client=ecs_client
+                cluster=cluster,
+                service=service,
+                region=region,
+                ecs_client=ecs_client,
+                services_cache=services_cache,
             )
         else:
             LOGGER.info("No active tasks found in service '{}'".format(service))
+        return running_service_tasks
+
+    with _batch_snapshot_invalidation(cluster, region):
+        services_tasks = run_for_services("stop", stop, services, parallelism)
+    all_running_service_tasks = [
+        task
+        for running_service_tasks in services_tasks.values()
+        for task in running_service_tasks
+    ]
 
     if all_running_service_tasks:
-        pool = ThreadPool(
-            number_of_services if number_of_services < THREAD_MAX else THREAD_MAX
-        )
-        pool.starmap(
-            wait_for_task_to_stop,
-            (
-                (cluster, task, timeout, region, ecs_client)
-                for task in all_running_service_tasks
-            ),
+        wait_for_tasks_to_stop(
+            cluster=cluster,
+            tasks=all_running_service_tasks,
+            timeout=timeout,
+            region=region,
+            ecs_client=ecs_client,
         )
-        pool.close()
-        pool.join()
 
 
 def stop_service_and_wait_for_tasks_to_stop(
-    cluster, service, timeout, region, ecs_client=None
+    cluster, service, timeout, region, ecs_client=None, services_cache=None
 ):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
@@ -704,7 +2126,13 @@ def stop_service_and_wait_for_tasks_to_stop(
         cluster=cluster, service=service, region=region, ecs_client=ecs_client
     )
 
-    stop_service(cluster=cluster, service=service, region=region, ecs_client=ecs_client)
+    stop_service(
+        cluster=cluster,
+        service=service,
+        region=region,
+        ecs_client=ecs_client,
+        services_cache=services_cache,
+    )
 
     if not tasks:
         LOGGER.info("No active tasks found in service '{}'".format(service))
@@ -720,7 +2148,7 @@ def stop_service_and_wait_for_tasks_to_stop(
 
 
 def start_service_and_wait_for_tasks_to_start(
-    cluster, service, count, region, ecs_client=None
+    cluster, service, count, region, ecs_client=None, services_cache=None
 ):
     """This function is currently not working as the tasks are not started
     immediately after the update of desired count
@@ -733,6 +2161,7 @@ def start_service_and_wait_for_tasks_to_start(
         count=count,
         region=region,
         ecs_client=ecs_client,
+        services_cache=services_cache,
     )
 
     tasks = get_tasks_for_service(
@@ -741,41 +2170,74 @@ def start_service_and_wait_for_tasks_to_start(
     wait_for_tasks_to_start(cluster=cluster, tasks=tasks, region=region)
 
 
-def get_min_capacity_for_service(cluster, service, region, as_client=None):
-    as_client = as_client if as_client else _get_autoscaling_client(region)
-
+def _describe_scalable_targets_chunk(resources_ids, as_client):
+    paginator = as_client.get_paginator("describe_scalable_targets")
     try:
-        response = as_client.describe_scalable_targets(
-            ServiceNamespace="ecs",
-            ResourceIds=[
-                "service/{}/{}".format(cluster, service),
-            ],
-        )
-    except ecs_client.exceptions.ServiceNotFoundException:
-        raise ClickException("Service not found: '{}'".format(service))
+        return [
+            target
+            for page in paginator.paginate(
+                ServiceNamespace="ecs",
+                ResourceIds=resources_ids,
+                ScalableDimension="ecs:service:DesiredCount",
+            )
+            for target in page["ScalableTargets"]
+        ]
     except ClientError as ex:
         raise ClickException(ex)
 
-    targets = response["ScalableTargets"]
 
-    if len(targets) < 1:
-        raise ClickException(
-            "No scalable targets found for cluster '{}' and service name '{}'".format(
-                cluster,
-                service,
-            )
+def get_min_capacities_for_services(cluster, services, region, as_client=None):
+    """
+    Returns dictionary of services and minimum capacities of their scalable targets, services without scalable target
+    are omitted. Scalable targets are described in chunks of 50 services which are loaded concurrently.
+    """
+    as_client = as_client if as_client else _get_autoscaling_client(region)
+
+    resources_ids = list(
+        dict.fromkeys(
+            "service/{}/{}".format(cluster, _get_service_name(service))
+            for service in services
         )
-    elif len(targets) > 1:
-        raise ClickException(
-            "Exactly one service per cluster is supported. Services found: {}".format(
-                len(targets)
+    )
+    chunks = [
+        resources_ids[i : i + DESCRIBE_SCALABLE_TARGETS_CHUNK_SIZE]
+        for i in range(0, len(resources_ids), DESCRIBE_SCALABLE_TARGETS_CHUNK_SIZE)
+    ]
+    if len(chunks) > 1:
+        with ThreadPool(min(len(chunks), DESCRIBE_SERVICES_THREAD_MAX)) as pool:
+            described_chunks = pool.starmap(
+                _in_current_context(_describe_scalable_targets_chunk),
+                ((chunk, as_client) for chunk in chunks),
             )
-        )
+    else:
+        described_chunks = [
+            _describe_scalable_targets_chunk(chunk, as_client) for chunk in chunks
+        ]
+
+    return {
+        _get_service_name(target["ResourceId"]): int(target["MinCapacity"])
+        for targets in described_chunks
+        for target in targets
+    }
 
-    return int(targets[0].get("MinCapacity"))
 
+def _get_no_scalable_target_message(cluster, service):
+    return "No scalable targets found for cluster '{}' and service name '{}'".format(
+        cluster,
+        service,
+    )
 
-def redeploy_service(cluster, service, region, ecs_client=None):
+
+def get_min_capacity_for_service(cluster, service, region, as_client=None):
+    min_capacities = get_min_capacities_for_services(
+        cluster=cluster, services=[service], region=region, as_client=as_client
+    )
+    if service not in min_capacities:
+        raise ClickException(_get_no_scalable_target_message(cluster, service))
+    return min_capacities[service]
+
+
+def redeploy_service(cluster, service, region, ecs_client=None, services_cache=None):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
     LOGGER.info("Redeploying service: {}".format(service))
@@ -793,46 +2255,229 @@ def redeploy_service(cluster, service, region, ecs_client=None):
     except ClientError as ex:
         raise ClickException(ex)
 
+    _invalidate_service(cluster, service, region, services_cache)
+
 
-def redeploy_services(cluster, services, region, ecs_client=None):
+def redeploy_services(
+    cluster,
+    services,
+    region,
+    ecs_client=None,
+    parallelism=DEFAULT_PARALLELISM,
+    services_cache=None,
+):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
 
-    for service in services:
-        redeploy_service(
-            cluster=cluster, service=service, region=region, ecs_client=ecs_client
+    with _batch_snapshot_invalidation(cluster, region):
+        run_for_services(
+            "redeploy",
+            lambda service: redeploy_service(
+                cluster=cluster,
+                service=service,
+                region=region,
+                ecs_client=ecs_client,
+                services_cache=services_cache,
+            ),
+            services,
+            parallelism,
         )
 
 
-def _get_non_daemon_services(cluster, region, ecs_client):
-    services = get_services_names(cluster=cluster, region=region, ecs_client=ecs_client)
+def _get_non_daemon_services(cluster, region, ecs_client, services_cache=None):
+    services = describe_services(
+        cluster=cluster,
+        services=get_services_names(
+            cluster=cluster, region=region, ecs_client=ecs_client
+        ),
+        region=region,
+        ecs_client=ecs_client,
+        services_cache=services_cache,
+    )
     return [
-        service
-        for service in services
-        if not is_service_type_daemon(
-            service=service, cluster=cluster, region=region, ecs_client=ecs_client
-        )
+        service_name
+        for service_name, service in services.items()
+        if service["schedulingStrategy"] != "DAEMON"
     ]
 
 
-def redeploy_cluster_services(cluster, region, ecs_client=None):
+def redeploy_cluster_services(
+    cluster,
+    region,
+    ecs_client=None,
+    parallelism=DEFAULT_PARALLELISM,
+    services_cache=None,
+):
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+    services_cache = services_cache if services_cache is not None else ServicesCache()
 
     redeploy_services(
         cluster=cluster,
-        services=_get_non_daemon_services(cluster, region, ecs_client),
+        services=_get_non_daemon_services(cluster, region, ecs_client, services_cache),
         region=region,
         ecs_client=ecs_client,
+        parallelism=parallelism,
+        services_cache=services_cache,
     )
 
 
-def wait_for_services_stable(cluster, region, ecs_client=None):
+def _log_deployment(service_name, deployment):
+    LOGGER.info(
+        "Service '{}' deployment {} [{}]: running {}, pending {}, desired {}{}{}".format(
+            service_name,
+            deployment["id"],
+            deployment["status"],
+            deployment["runningCount"],
+            deployment["pendingCount"],
+            deployment["desiredCount"],
+            (
+                ", failed tasks {}".format(deployment["failedTasks"])
+                if deployment.get("failedTasks")
+                else ""
+            ),
+            (
+                ", rollout {}".format(deployment["rolloutState"])
+                if "rolloutState" in deployment
+                else ""
+            ),
+        )
+    )
+
+
+def _is_service_stable(service):
+    deployments = service["deployments"]
+    return (
+        len(deployments) == 1
+        and deployments[0]["runningCount"] == deployments[0]["desiredCount"]
+    )
+
+
+def watch_rollout(
+    cluster,
+    services,
+    region,
+    timeout=DEFAULT_ROLLOUT_TIMEOUT,
+    max_failed_tasks=DEFAULT_MAX_FAILED_TASKS,
+    ecs_client=None,
+    services_cache=None,
+):
+    """
+    Waits until the services are stable (they have only one deployment with all tasks running). Deployments and new
+    events of all services are polled together and their changes are logged. Exception is raised as soon as rollout of
+    a deployment fails or number of failed tasks of the primary deployment reaches max_failed_tasks (0 disables the
+    check).
+    """
     ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
-    waiter = ecs_client.get_waiter("services_stable")
+    services_cache = services_cache if services_cache is not None else ServicesCache()
+
+    started_at = datetime.now(timezone.utc)
+    deployments_states = {}
+    logged_events = set()
+    pending_services = [_get_service_name(service) for service in services]
+
+    def check():
+        # Only the services metadata of the invocation are reloaded, the snapshot is invalidated by the updates
+        for service_name in pending_services:
+            services_cache.invalidate(cluster, service_name, region)
+        described_services = describe_services(
+            cluster=cluster,
+            services=pending_services,
+            region=region,
+            ecs_client=ecs_client,
+            services_cache=services_cache,
+        )
 
-    non_daemon_services = _get_non_daemon_services(cluster, region, ecs_client)
+        changed = False
+        for service_name in list(pending_services):
+            if service_name not in described_services:
+                raise ClickException("Service not found: '{}'".format(service_name))
+            service = described_services[service_name]
+
+            # Events are sorted from the newest one
+            for event in reversed(service.get("events", [])):
+                if (
+                    event["createdAt"] >= started_at
+                    and event["id"] not in logged_events
+                ):
+                    logged_events.add(event["id"])
+                    changed = True
+                    LOGGER.info(
+                        "Service '{}': {}".format(service_name, event["message"])
+                    )
+
+            for deployment in service["deployments"]:
+                state = [
+                    deployment.get(key)
+                    for key in (
+                        "status",
+                        "runningCount",
+                        "pendingCount",
+                        "desiredCount",
+                        "failedTasks",
+                        "rolloutState",
+                    )
+                ]
+                if deployments_states.get(deployment["id"]) != state:
+                    deployments_states[deployment["id"]] = state
+                    changed = True
+                    _log_deployment(service_name, deployment)
+
+                if deployment.get("rolloutState") == "FAILED":
+                    raise ClickException(
+                        "Rollout of service '{}' failed: {}".format(
+                            service_name,
+                            deployment.get("rolloutStateReason", "UNDEFINED"),
+                        )
+                    )
+                if (
+                    max_failed_tasks
+                    and deployment["status"] == "PRIMARY"
+                    and deployment.get("failedTasks", 0) >= max_failed_tasks
+                ):
+                    raise ClickException(
+                        "Rollout of service '{}' failed: {} tasks of the deployment failed".format(
+                            service_name, deployment["failedTasks"]
+                        )
+                    )
+
+            if _is_service_stable(service):
+                LOGGER.info("Service '{}' is stable.".format(service_name))
+                pending_services.remove(service_name)
+        return not pending_services, changed
+
+    if pending_services:
+        poll_until(
+            "waiting for stable services",
+            check,
+            timeout,
+            ROLLOUT_POLL_MIN_DELAY,
+            ROLLOUT_POLL_MAX_DELAY,
+            timeout_message=lambda: "services are not stable: {}".format(
+                ", ".join(pending_services)
+            ),
+        )
 
-    try:
-        for i in range(0, len(non_daemon_services), 10):  # split into chunks by 10
-            waiter.wait(cluster=cluster, services=non_daemon_services[i : i + 10])
-    except WaiterError as ex:
-        raise ClickException(ex)
+
+def wait_for_services_stable(
+    cluster,
+    region,
+    ecs_client=None,
+    timeout=DEFAULT_ROLLOUT_TIMEOUT,
+    max_failed_tasks=0,
+    services_cache=None,
+):
+    """
+    Waits until all non-daemon services of the cluster are stable, see watch_rollout. Failed tasks are not checked by
+    default, so the services can recover from failing tasks.
+    """
+    ecs_client = ecs_client if ecs_client else _get_ecs_client(region)
+    services_cache = services_cache if services_cache is not None else ServicesCache()
+
+    watch_rollout(
+        cluster=cluster,
+        services=_get_non_daemon_services(cluster, region, ecs_client, services_cache),
+        region=region,
+        timeout=timeout,
+        max_failed_tasks=max_failed_tasks,
+        ecs_client=ecs_client,
+        services_cache=services_cache,
+    )
@@ -1,10 +1,11 @@
 from urllib.parse import quote_plus
 
 import time
-import requests
 from click import UsageError
 from urllib.parse import quote
 
+from developers_chamber.utils import get_http_session
+
 
 def create_merge_request(
     url,
@@ -18,7 +19,7 @@ def create_merge_request(
     automerge=False,
     remove_source_branch=False,
 ):
-    response = requests.post(
+    response = get_http_session().post(
         f"{url}/api/v4/projects/{quote_plus(project)}/merge_requests",
         headers={
             "PRIVATE-TOKEN": token,
@@ -45,7 +46,7 @@ def create_merge_request(
 
 def activate_automerge(url, token, project, merge_request_id, retries=5):
     for _ in range(retries):
-        merge_response = requests.put(
+        merge_response = get_http_session().put(
             f"{url}/api/v4/projects/{quote_plus(project)}/merge_requests/{merge_request_id}/merge",
             json={"merge_when_pipeline_succeeds": True},
             headers={
@@ -59,7 +60,7 @@ def activate_automerge(url, token, project, merge_request_id, retries=5):
 
 
 def run_job(url, token, project, ref, variables):
-    response = requests.post(
+    response = get_http_session().post(
         f"{url}/api/v4/projects/{quote_plus(project)}/pipeline",
         headers={
             "PRIVATE-TOKEN": token,
@@ -83,7 +84,7 @@ def run_job(url, token, project, ref, variables):
 
 
 def get_project_id(url, project, token):
-    response = requests.get(
+    response = get_http_session().get(
         f"{url}/api/v4/projects/{quote_plus(project)}",
         headers={
             "PRIVATE-TOKEN": token,
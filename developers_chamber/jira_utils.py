@@ -8,8 +8,10 @@ from jira import JIRA, JIRAError
 from requests.exceptions import ConnectionError
 
 from .git_utils import get_current_issue_key
+from .tracing import traced
 
 
+@traced("jira")
 def clean_issue_key(issue_key=None, project_key=None):
     if not issue_key:
         issue_key = get_current_issue_key()
@@ -23,6 +25,7 @@ def clean_issue_key(issue_key=None, project_key=None):
         return issue_key
 
 
+@traced("jira")
 def get_jira_client(url, username, api_key):
     try:
         client = JIRA(url, basic_auth=(username, api_key))
@@ -31,6 +34,7 @@ def get_jira_client(url, username, api_key):
         raise click.BadParameter("Invalid Jira URL or connection problem")
 
 
+@traced("jira")
 def get_current_user_issues(url, username, api_key, project_key, jql):
     issues = get_jira_client(url, username, api_key).search_issues(
         jql.format(project_key=project_key)
@@ -45,6 +49,7 @@ def get_current_user_issues(url, username, api_key, project_key, jql):
     )
 
 
+@traced("jira")
 def get_branch_name(url, username, api_key, issue_key, project_key=None):
     issue_key = clean_issue_key(issue_key, project_key)
 
@@ -58,6 +63,7 @@ def get_branch_name(url, username, api_key, issue_key, project_key=None):
         raise click.BadParameter("Invalid issue key {}".format(issue_key))
 
 
+@traced("jira")
 def show_issue(url, username, api_key, issue_key, project_key=None):
     issue_key = clean_issue_key(issue_key, project_key)
 
@@ -68,6 +74,7 @@ def show_issue(url, username, api_key, issue_key, project_key=None):
         raise click.BadParameter("Invalid issue key {}".format(issue_key))
 
 
+@traced("jira")
 def get_issue_fields(url, username, api_key, issue_key, project_key=None):
     issue_key = clean_issue_key(issue_key, project_key)
     try:
@@ -77,6 +84,7 @@ def get_issue_fields(url, username, api_key, issue_key, project_key=None):
         raise click.BadParameter("Invalid issue key {}".format(issue_key))
 
 
+@traced("jira")
 def log_issue_time(
     url, username, api_key, issue_key, time_spend, comment=None, project_key=None
 ):
@@ -94,6 +102,7 @@ def log_issue_time(
         raise click.BadParameter("Invalid issue key {}".format(issue_key))
 
 
+@traced("jira")
 def get_issue_worklog(url, username, api_key, issue_key, project_key=None):
     issue_key = clean_issue_key(issue_key, project_key)
 
@@ -105,6 +114,7 @@ def get_issue_worklog(url, username, api_key, issue_key, project_key=None):
         raise click.BadParameter("Invalid issue key {}".format(issue_key))
 
 
+@traced("jira")
 def invoke_issues_transition(url, username, api_key, jql, transition):
     jira = get_jira_client(url, username, api_key)
     issues = jira.search_issues(jql)
@@ -0,0 +1,215 @@
+"""
+Import time profiler of the pydev startup. The module must import only the standard library because it is imported
+before all other pydev dependencies.
+"""
+
+import atexit
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+PROFILE_STARTUP_ARGUMENT = "--profile-startup"
+PROFILE_STARTUP_SETTING = "PYDEV_PROFILE_STARTUP"
+NUMBER_OF_PRINTED_MODULES = 25
+
+_profiler = None
+
+
+class _TimedLoader:
+    """
+    Loader proxy which measures time of the module execution.
+    """
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.profiler.module_started()
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler.module_finished(module.__name__, time.perf_counter() - start)
+            # The original loader is returned back to the module
+            module.__loader__ = self.loader
+            if module.__spec__ is not None:
+                module.__spec__.loader = self.loader
+
+
+class _TimedFinder:
+    """
+    Meta path finder which wraps loaders of all the other finders into the timed loader.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, self.profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """
+    Collects import time of modules and attributes it to the pydev subsystem which imported the module.
+    """
+
+    def __init__(self, output=None):
+        self.output = output
+        self.subsystem = "other"
+        self.subsystems = {}
+        self.modules = {}
+        self._children_times = []
+
+    def install(self):
+        sys.meta_path.insert(0, _TimedFinder(self))
+        atexit.register(self.report)
+
+    @contextmanager
+    def profile_subsystem(self, name):
+        parent_subsystem, self.subsystem = self.subsystem, name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            subsystem = self.subsystems.setdefault(name, {"time": 0.0, "modules": 0})
+            subsystem["time"] += time.perf_counter() - start
+            self.subsystem = parent_subsystem
+
+    def module_started(self):
+        self._children_times.append(0.0)
+
+    def module_finished(self, name, cumulative_time):
+        self_time = cumulative_time - self._children_times.pop()
+        if self._children_times:
+            self._children_times[-1] += cumulative_time
+        self.modules[name] = {
+            "subsystem": self.subsystem,
+            "self": self_time,
+            "cumulative": cumulative_time,
+        }
+        subsystem = self.subsystems.setdefault(
+            self.subsystem, {"time": 0.0, "modules": 0}
+        )
+        subsystem["modules"] += 1
+        if self.subsystem == "other":
+            subsystem["time"] += self_time
+
+    def get_results(self):
+        return {
+            "subsystems": dict(
+                sorted(
+                    self.subsystems.items(),
+                    key=lambda item: item[1]["time"],
+                    reverse=True,
+                )
+            ),
+            "modules": dict(
+                sorted(
+                    self.modules.items(),
+                    key=lambda item: item[1]["self"],
+                    reverse=True,
+                )
+            ),
+        }
+
+    def _print_table(self, headers, rows):
+        widths = [
+            max(len(str(row[i])) for row in [headers] + rows)
+            for i in range(len(headers))
+        ]
+        for row in [headers] + rows:
+            print(
+                "  ".join(str(value).ljust(width) for value, width in zip(row, widths)),
+                file=sys.stderr,
+            )
+        print(file=sys.stderr)
+
+    def report(self):
+        results = self.get_results()
+        if self.output:
+            with open(self.output, "w") as f:
+                json.dump(results, f, indent=2)
+            return
+
+        print(file=sys.stderr)
+        self._print_table(
+            ["subsystem", "time [ms]", "imported modules"],
+            [
+                [name, "{:.1f}".format(data["time"] * 1000), data["modules"]]
+                for name, data in results["subsystems"].items()
+            ],
+        )
+        self._print_table(
+            ["module", "self [ms]", "cumulative [ms]", "subsystem"],
+            [
+                [
+                    name,
+                    "{:.1f}".format(data["self"] * 1000),
+                    "{:.1f}".format(data["cumulative"] * 1000),
+                    data["subsystem"],
+                ]
+                for name, data in list(results["modules"].items())[
+                    :NUMBER_OF_PRINTED_MODULES
+                ]
+            ],
+        )
+
+
+def enable_startup_profiling(argv):
+    """
+    Installs the startup profiler if "--profile-startup[=FILE]" argument is used before the pydev command or
+    PYDEV_PROFILE_STARTUP setting is set. The argument is removed from argv. Results are printed to the standard error
+    output or written to the JSON file when pydev exits.
+    """
+    global _profiler
+
+    enabled = False
+    output = None
+    setting = os.environ.get(PROFILE_STARTUP_SETTING)
+    if setting:
+        enabled = True
+        output = None if setting.lower() in ("1", "true", "on") else setting
+
+    for i, arg in enumerate(argv[1:], start=1):
+        if not arg.startswith("-"):
+            break
+        if arg == PROFILE_STARTUP_ARGUMENT or arg.startswith(
+            PROFILE_STARTUP_ARGUMENT + "="
+        ):
+            enabled = True
+            output = arg.partition("=")[2] or output
+            del argv[i]
+            break
+
+    if enabled and _profiler is None:
+        _profiler = StartupProfiler(output)
+        _profiler.install()
+
+
+@contextmanager
+def profile_subsystem(name):
+    """
+    Attributes imports inside the block to the subsystem if the startup profiling is enabled.
+    """
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.profile_subsystem(name):
+            yield
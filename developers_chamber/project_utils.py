@@ -18,6 +18,7 @@ from developers_chamber.utils import (
     pretty_time_delta,
     INSTALLED_MODULES,
 )
+from developers_chamber.tracing import trace_command
 
 LOGGER = logging.getLogger()
 
@@ -193,7 +194,8 @@ if (
 def get_command_output(command):
     try:
         LOGGER.info(command if isinstance(command, str) else " ".join(command))
-        return subprocess.check_output(command, shell=isinstance(command, str))
+        with trace_command(command):
+            return subprocess.check_output(command, shell=isinstance(command, str))
     except subprocess.CalledProcessError:
         raise ClickException("Command returned error")
 
@@ -1,17 +1,174 @@
+import importlib
+
 import click
 from click.formatting import HelpFormatter
 from gettext import gettext as _
 from developers_chamber.click.alias import AliasCommand
+from developers_chamber.click.manifest import build_command, load_manifest
+from developers_chamber.profiling import profile_subsystem
+from developers_chamber.utils import INSTALLED_MODULES
+
+# Subcommand name -> (module which registers the subcommand, required installed module)
+SUBCOMMAND_MODULES = {
+    "batch": ("developers_chamber.scripts.batch", None),
+    "bind": ("developers_chamber.scripts.bind", None),
+    "bitbucket": ("developers_chamber.scripts.bitbucket", "bitbucket"),
+    "docker": ("developers_chamber.scripts.docker", None),
+    "ecs": ("developers_chamber.scripts.ecs", "aws"),
+    "git": ("developers_chamber.scripts.git", "git"),
+    "gitlab": ("developers_chamber.scripts.gitlab", "gitlab"),
+    "jira": ("developers_chamber.scripts.jira", "jira"),
+    "project": ("developers_chamber.scripts.project", None),
+    "qa": ("developers_chamber.scripts.qa", "qa"),
+    "server": ("developers_chamber.scripts.server", None),
+    "sh": ("developers_chamber.scripts.sh", None),
+    "slack": ("developers_chamber.scripts.slack", "slack"),
+    "toggl": ("developers_chamber.scripts.toggle", "toggle"),
+    "version": ("developers_chamber.scripts.version", None),
+}
 
 
 class FullHelpGroup(click.Group):
+    """
+    Root group which imports the module of a subcommand only when the subcommand is invoked. Help and shell
+    completion of not imported subcommands are answered from the commands manifest.
+    """
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+        self._manifest = None
+
+    def get_lazy_subcommands(self):
+        """
+        Returns lazy subcommands names mapped to their modules paths if the required module is installed.
+        """
+        return {
+            name: module_path
+            for name, (module_path, requirement) in self.lazy_subcommands.items()
+            if requirement is None or requirement in INSTALLED_MODULES
+        }
+
+    def list_commands(self, ctx):
+        return sorted(
+            set(super().list_commands(ctx)) | set(self.get_lazy_subcommands())
+        )
+
+    def is_loaded(self, cmd_name):
+        return cmd_name in self.commands or cmd_name not in self.lazy_subcommands
+
+    def get_manifest(self):
+        if self._manifest is None:
+            with profile_subsystem("commands manifest"):
+                self._manifest = load_manifest(self)
+        return self._manifest
+
+    def get_manifest_command(self, cmd_name):
+        """
+        Returns the subcommand built from the commands manifest without importing its module.
+        """
+        data = self.get_manifest()["command"]["commands"].get(cmd_name)
+        return build_command(data) if data else None
+
+    def get_manifest_aliases(self, alias_name):
+        """
+        Returns aliased commands of the alias resolved in the commands manifest or None if they are not resolved.
+        """
+        manifest_command = self.get_manifest()["command"]
+        data = manifest_command["commands"].get(alias_name)
+        if not data or "aliases" not in data:
+            return None
+
+        aliases = []
+        for used_command_parts, remaining_command_parts, alias_str in data["aliases"]:
+            command_data = manifest_command
+            for command_part in used_command_parts:
+                command_data = command_data["commands"][command_part]
+            aliases.append(
+                (
+                    used_command_parts,
+                    remaining_command_parts,
+                    build_command(command_data),
+                    alias_str,
+                )
+            )
+        return aliases
+
+    def is_help_request(self, ctx, args):
+        """
+        Returns True if the subcommand arguments ask for help of the subcommand group or its nested group. Help of the
+        commands is not answered from the manifest, because the manifest does not describe types, defaults and
+        required options of the commands.
+        """
+        # Manifest is not loaded for the commands which are run
+        if not set(args[1:]) & set(ctx.help_option_names):
+            return False
+
+        data = self.get_manifest()["command"]["commands"].get(args[0])
+        if data is None or "commands" not in data:
+            return False
+
+        remaining_args = iter(args[1:])
+        for arg in remaining_args:
+            if arg == "--":
+                return False
+            if arg in ctx.help_option_names:
+                return True
+            if not arg.startswith("-"):
+                # Only nested groups are answered, not existing commands are reported by the imported group
+                data = data["commands"].get(arg)
+                if data is None or "commands" not in data:
+                    return False
+                continue
+            param = next(
+                (
+                    param
+                    for param in data["params"]
+                    if param["param_type_name"] == "option"
+                    and arg in param["opts"] + param["secondary_opts"]
+                ),
+                None,
+            )
+            if param is not None and not param["is_flag"] and not param["count"]:
+                next(remaining_args, None)
+        return False
+
+    def resolve_command(self, ctx, args):
+        cmd_name = args[0] if args else None
+        if (
+            cmd_name not in self.commands
+            and cmd_name in self.get_lazy_subcommands()
+            and self.is_help_request(ctx, args)
+        ):
+            # Help of not imported subcommands is answered from the commands manifest
+            cmd = self.get_manifest_command(cmd_name)
+            if cmd is not None:
+                return cmd_name, cmd, args[1:]
+        return super().resolve_command(ctx, args)
+
+    def get_command(self, ctx, cmd_name):
+        lazy_subcommands = self.get_lazy_subcommands()
+        if cmd_name not in self.commands and cmd_name in lazy_subcommands:
+            # Shell completion resolves commands with resilient parsing
+            if ctx is not None and ctx.resilient_parsing:
+                cmd = self.get_manifest_command(cmd_name)
+                if cmd is not None:
+                    return cmd
+            # The module registers the subcommand to the group itself
+            with profile_subsystem("scripts: {}".format(cmd_name)):
+                importlib.import_module(lazy_subcommands[cmd_name])
+        return super().get_command(ctx, cmd_name)
+
     def format_commands(self, ctx, formatter) -> None:
         """Extra format methods for multi methods that adds all the commands
         after the options.
         """
         all_commands = []
         for subcommand in self.list_commands(ctx):
-            cmd = self.get_command(ctx, subcommand)
+            if self.is_loaded(subcommand):
+                cmd = self.get_command(ctx, subcommand)
+            else:
+                cmd = self.get_manifest_command(subcommand)
             # What is this, the tool lied about a command.  Ignore it
             if cmd is None:
                 continue
@@ -44,6 +201,13 @@ class FullHelpGroup(click.Group):
                         formatter.write_dl(rows)
 
 
-@click.group(cls=FullHelpGroup)
+@click.group(cls=FullHelpGroup, lazy_subcommands=SUBCOMMAND_MODULES)
+@click.option(
+    "--profile-startup",
+    help="Print import time of pydev subsystems and modules, use --profile-startup=FILE to write it to a JSON file "
+    "(or set PYDEV_PROFILE_STARTUP setting)",
+    is_flag=True,
+    expose_value=False,
+)
 def cli():
     pass
@@ -0,0 +1,124 @@
+import logging
+import shlex
+import time
+from multiprocessing.pool import ThreadPool
+
+import click
+
+from developers_chamber.scripts import cli
+
+LOGGER = logging.getLogger()
+
+INDEPENDENT_COMMAND_PREFIX = "&"
+
+
+def _parse_batch(file):
+    """
+    Returns list of steps, every step is a list of (line number, command) which can be run concurrently.
+    """
+    steps = []
+    independent_step = None
+    for line_number, line in enumerate(file, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        if line.startswith(INDEPENDENT_COMMAND_PREFIX):
+            command = line[len(INDEPENDENT_COMMAND_PREFIX) :].strip()
+            if independent_step is None:
+                independent_step = []
+                steps.append(independent_step)
+            independent_step.append((line_number, command))
+        else:
+            independent_step = None
+            steps.append([(line_number, line)])
+    return steps
+
+
+def _run_batch_command(line_number, command):
+    """
+    Runs pydev command in the current process and returns its exit code.
+    """
+    start = time.perf_counter()
+    try:
+        result = cli.main(
+            args=shlex.split(command), prog_name="pydev", standalone_mode=False
+        )
+        exit_code = result if isinstance(result, int) else 0
+    except click.ClickException as ex:
+        ex.show()
+        exit_code = ex.exit_code
+    except click.Abort:
+        click.echo("Aborted!", err=True)
+        exit_code = 1
+    except SystemExit as ex:
+        exit_code = ex.code if isinstance(ex.code, int) else 1
+    except Exception:
+        # Failure of one command must not stop the batch with --keep-going
+        LOGGER.exception('[line {}] "{}" failed'.format(line_number, command))
+        exit_code = 1
+
+    LOGGER.info(
+        '[line {}] "{}" finished in {:.2f}s with exit code {}'.format(
+            line_number, command, time.perf_counter() - start, exit_code
+        )
+    )
+    return exit_code
+
+
+@cli.command()
+@click.argument("file", type=click.File("r"))
+@click.option(
+    "--keep-going/--stop-on-error",
+    "-k/-s",
+    help="Continue with the next commands when a command fails",
+    default=False,
+)
+@click.option(
+    "--jobs",
+    "-j",
+    help="Number of independent commands run concurrently",
+    type=int,
+    default=1,
+)
+def batch(file, keep_going, jobs):
+    """
+    Run pydev commands from the file (one command per line, "-" for the standard input) in one process, so the
+    imported modules and AWS and HTTP sessions are shared.
+
+    \b
+    * empty lines and lines starting with "#" are skipped
+    * lines starting with "&" are independent, consecutive independent commands are run concurrently with --jobs
+      example:
+        version print
+        & ecs redeploy-services -s api
+        & ecs redeploy-services -s worker
+    """
+    if jobs < 1:
+        raise click.BadParameter("Number of jobs must be greater than zero.")
+
+    start = time.perf_counter()
+    failed_commands = []
+    for step in _parse_batch(file):
+        if len(step) > 1 and jobs > 1:
+            with ThreadPool(min(jobs, len(step))) as pool:
+                exit_codes = pool.starmap(_run_batch_command, step)
+        else:
+            exit_codes = [_run_batch_command(*command) for command in step]
+
+        failed_commands += [
+            command for command, exit_code in zip(step, exit_codes) if exit_code != 0
+        ]
+        if failed_commands and not keep_going:
+            break
+
+    LOGGER.info("Batch finished in {:.2f}s".format(time.perf_counter() - start))
+    if failed_commands:
+        raise click.ClickException(
+            "Failed commands:\n{}".format(
+                "\n".join(
+                    '[line {}] "{}"'.format(line_number, command)
+                    for line_number, command in failed_commands
+                )
+            )
+        )
@@ -1,7 +1,13 @@
+import contextvars
+import functools
+import logging
 import os
+import time
+from multiprocessing.pool import ThreadPool
 
 import click
 
+from developers_chamber.ecs_utils import DEFAULT_SNAPSHOT_TTL, ServicesCache, log_prefix
 from developers_chamber.ecs_utils import (
     deploy_new_task_definition as deploy_new_task_definition_func,
 )
@@ -12,6 +18,8 @@ from developers_chamber.ecs_utils import (
 from developers_chamber.ecs_utils import (
     get_tasks_for_service as get_tasks_for_service_func,
 )
+from developers_chamber.ecs_utils import iter_services_names as iter_services_names_func
+from developers_chamber.ecs_utils import iter_tasks_arns as iter_tasks_arns_func
 from developers_chamber.ecs_utils import (
     redeploy_cluster_services as redeploy_cluster_services_func,
 )
@@ -21,15 +29,20 @@ from developers_chamber.ecs_utils import (
 )
 from developers_chamber.ecs_utils import run_service_task as run_service_task_func
 from developers_chamber.ecs_utils import run_task as run_task_func
+from developers_chamber.ecs_utils import run_tasks as run_tasks_func
 from developers_chamber.ecs_utils import (
     run_task_and_wait_for_success as run_task_and_wait_for_success_func,
 )
 from developers_chamber.ecs_utils import (
     start_cluster_services as start_cluster_services_func,
 )
+from developers_chamber.ecs_utils import (
+    start_cluster_services_in_waves as start_cluster_services_in_waves_func,
+)
 from developers_chamber.ecs_utils import start_service as start_service_func
 from developers_chamber.ecs_utils import start_services as start_services_func
 from developers_chamber.ecs_utils import stop_service as stop_service_func
+from developers_chamber.ecs_utils import take_snapshot as take_snapshot_func
 from developers_chamber.ecs_utils import (
     stop_service_and_wait_for_tasks_to_stop as stop_service_and_wait_for_tasks_to_stop_func,
 )
@@ -42,10 +55,133 @@ from developers_chamber.ecs_utils import (
 from developers_chamber.ecs_utils import (
     wait_for_services_stable as wait_for_services_stable_func,
 )
+from developers_chamber.ecs_utils import watch_rollout as watch_rollout_func
 from developers_chamber.scripts import cli
 
-default_region = os.environ.get("AWS_REGION")
+LOGGER = logging.getLogger()
+
+# AWS_REGION is used by boto3 and AWS CLI too, more regions are set with a separate setting
+default_region = os.environ.get("AWS_ECS_REGIONS") or os.environ.get("AWS_REGION")
 default_cluster = os.environ.get("AWS_ECS_CLUSTER")
+default_regions = default_region.split(",") if default_region else None
+default_clusters = default_cluster.split(",") if default_cluster else None
+default_parallelism = os.environ.get("AWS_ECS_PARALLELISM", 10)
+default_cache_ttl = os.environ.get("PYDEV_ECS_CACHE_TTL")
+default_start_tiers = os.environ.get("AWS_ECS_START_TIERS")
+
+
+def _get_cache_ttl(cached):
+    if not cached:
+        return None
+    return int(default_cache_ttl) if default_cache_ttl else DEFAULT_SNAPSHOT_TTL
+
+
+def _echo(message):
+    """
+    Prints the message prefixed with the target name if the command is run for more targets.
+    """
+    prefix = log_prefix.get()
+    click.echo("[{}] {}".format(prefix, message) if prefix is not None else message)
+
+
+def _get_targets(clusters, regions, targets_file):
+    """
+    Returns list of (cluster, region) targets, cluster is None for commands without cluster.
+    """
+    if targets_file is not None:
+        targets = []
+        for line in targets_file:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                cluster, region = line.split()
+            except ValueError:
+                raise click.BadParameter(
+                    'Invalid target "{}", the line must contain cluster and region'.format(
+                        line
+                    ),
+                    param_hint="'--targets'",
+                )
+            targets.append((cluster if clusters is not None else None, region))
+        # Region only commands can have duplicate targets
+        return list(dict.fromkeys(targets))
+
+    if clusters is not None and not clusters:
+        raise click.UsageError('Missing option "--cluster" or "--targets".')
+    if not regions:
+        raise click.UsageError('Missing option "--region" or "--targets".')
+    return [
+        (cluster, region)
+        for cluster in (clusters if clusters is not None else [None])
+        for region in regions
+    ]
+
+
+def for_each_target(f):
+    """
+    Runs the command for every target (combination of --cluster and --region values or lines of --targets file)
+    concurrently. Output of every target is prefixed with the target name and the results are summarized.
+    """
+
+    @click.option(
+        "--targets",
+        help='File with targets of the command, every line contains cluster and region (e.g. "prod eu-west-1")',
+        type=click.File("r"),
+        default=None,
+    )
+    @functools.wraps(f)
+    def command(targets, **kwargs):
+        targets = _get_targets(kwargs.get("cluster"), kwargs["region"], targets)
+
+        def get_target_kwargs(cluster, region):
+            target_kwargs = dict(kwargs, region=region)
+            if cluster is not None:
+                target_kwargs["cluster"] = cluster
+            return target_kwargs
+
+        if len(targets) == 1:
+            return f(**get_target_kwargs(*targets[0]))
+
+        ctx = click.get_current_context()
+
+        def run_target(cluster, region):
+            target_name = "{}/{}".format(cluster, region) if cluster else region
+            # Output of the target (including the threads started by the helpers) is prefixed with its name
+            log_prefix.set(target_name)
+            start = time.perf_counter()
+            try:
+                with ctx.scope(cleanup=False):
+                    f(**get_target_kwargs(cluster, region))
+                error = None
+            except click.ClickException as ex:
+                error = ex.format_message()
+            except Exception as ex:
+                error = repr(ex)
+            return target_name, error, time.perf_counter() - start
+
+        def run(cluster, region):
+            return contextvars.copy_context().run(run_target, cluster, region)
+
+        with ThreadPool(len(targets)) as pool:
+            results = pool.starmap(run, targets)
+
+        LOGGER.info("Targets summary:")
+        for target_name, error, duration in results:
+            LOGGER.info(
+                "  {}: {} [{:.1f}s]".format(
+                    target_name,
+                    "OK" if error is None else "FAILED ({})".format(error),
+                    duration,
+                )
+            )
+        failed_targets = [target_name for target_name, error, _ in results if error]
+        if failed_targets:
+            raise click.ClickException(
+                "Command failed for targets: {}".format(", ".join(failed_targets))
+            )
+
+    return command
 
 
 @cli.group()
@@ -54,13 +190,14 @@ def ecs():
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--service", "-s", help="ECS service names", type=str, required=True)
 @click.option(
@@ -74,16 +211,66 @@ def ecs():
     required=True,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--wait",
+    help="Wait until the services are stable and fail when the deployment fails",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--wait-timeout",
+    help="Seconds to wait for the services to be stable",
+    type=int,
+    default=600,
+)
+@click.option(
+    "--max-failed-tasks",
+    help="Number of failed tasks which fails the deployment (0 disables the check)",
+    type=int,
+    default=3,
 )
-def deploy_new_task_definition(cluster, service, task_definition, images, region):
+def deploy_new_task_definition(
+    cluster,
+    service,
+    task_definition,
+    images,
+    region,
+    wait,
+    wait_timeout,
+    max_failed_tasks,
+):
     """
     Deploy new task definition in AWS ECS. This command also updates the service and forces new deployment.
     """
-    deploy_new_task_definition_func(cluster, service, task_definition, images, region)
+    services_cache = ServicesCache()
+    deploy_new_task_definition_func(
+        cluster,
+        service,
+        task_definition,
+        images,
+        region,
+        services_cache=services_cache,
+    )
+    if wait:
+        watch_rollout_func(
+            cluster,
+            [service],
+            region,
+            timeout=wait_timeout,
+            max_failed_tasks=max_failed_tasks,
+            services_cache=services_cache,
+        )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--task-definition", "-t", help="ECS task definition name", type=str, required=True
 )
@@ -95,47 +282,96 @@ def deploy_new_task_definition(cluster, service, task_definition, images, region
     required=True,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
 def register_new_task_definition(task_definition, images, region):
     """
     Register new task definition in AWS ECS.
     """
-    click.echo(register_new_task_definition_func(task_definition, images, region))
+    _echo(register_new_task_definition_func(task_definition, images, region))
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--service", "-s", help="ECS service names", type=str, required=True)
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--wait",
+    help="Wait until the services are stable and fail when the deployment fails",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--wait-timeout",
+    help="Seconds to wait for the services to be stable",
+    type=int,
+    default=600,
 )
-def update_service_to_latest_task_definition(cluster, service, region):
+@click.option(
+    "--max-failed-tasks",
+    help="Number of failed tasks which fails the deployment (0 disables the check)",
+    type=int,
+    default=3,
+)
+def update_service_to_latest_task_definition(
+    cluster, service, region, wait, wait_timeout, max_failed_tasks
+):
     """
     Update service with the latest available task_definition.
     """
-    update_service_to_latest_task_definition_func(cluster, service, region)
+    services_cache = ServicesCache()
+    update_service_to_latest_task_definition_func(
+        cluster, service, region, services_cache=services_cache
+    )
+    if wait:
+        watch_rollout_func(
+            cluster,
+            [service],
+            region,
+            timeout=wait_timeout,
+            max_failed_tasks=max_failed_tasks,
+            services_cache=services_cache,
+        )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--service", "-s", help="ECS service name", type=str, required=True)
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
 def stop_service(cluster, service, region):
     """
@@ -145,18 +381,24 @@ def stop_service(cluster, service, region):
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--service", "-s", help="ECS service name", type=str, required=True)
 @click.option("--count", "-o", help="Desired count for service", type=int)
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
 def start_service(cluster, service, count, region):
     """
@@ -166,33 +408,98 @@ def start_service(cluster, service, count, region):
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--count", "-o", help="Desired count for service", type=int)
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--parallelism",
+    "-p",
+    help="Maximum number of services updated concurrently",
+    type=int,
+    default=default_parallelism,
+)
+@click.option(
+    "--tiers",
+    help='Services started in waves in the order of tiers, tiers are separated by semicolon and services by comma (e.g. "db,cache;api"), other services are started in the last wave',
+    type=str,
+    default=default_start_tiers,
+)
+@click.option(
+    "--wave-size",
+    help="Maximum number of services started in one wave, the next wave is started when the services are stable",
+    type=int,
+    default=None,
 )
-def start_cluster_services(cluster, count, region):
+@click.option(
+    "--wait-timeout",
+    help="Seconds to wait for the services of a wave to be stable",
+    type=int,
+    default=600,
+)
+@click.option(
+    "--max-failed-tasks",
+    help="Number of failed tasks which fails the wave (0 disables the check)",
+    type=int,
+    default=3,
+)
+def start_cluster_services(
+    cluster,
+    count,
+    region,
+    parallelism,
+    tiers,
+    wave_size,
+    wait_timeout,
+    max_failed_tasks,
+):
     """
     Start an AWS ECS service by updating its desiredCount to 0.
+
+    Services are started in waves if tiers or wave size are set.
     """
-    start_cluster_services_func(cluster, count, region)
+    if tiers or wave_size:
+        start_cluster_services_in_waves_func(
+            cluster,
+            count,
+            region,
+            tiers=(
+                [tier.split(",") for tier in tiers.split(";") if tier]
+                if tiers
+                else None
+            ),
+            wave_size=wave_size,
+            parallelism=parallelism,
+            timeout=wait_timeout,
+            max_failed_tasks=max_failed_tasks,
+        )
+    else:
+        start_cluster_services_func(cluster, count, region, parallelism=parallelism)
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option(
     "--services",
@@ -203,24 +510,37 @@ def start_cluster_services(cluster, count, region):
 )
 @click.option("--count", "-o", help="Desired count for service", type=int)
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
-def start_services(cluster, services, count, region):
+@click.option(
+    "--parallelism",
+    "-p",
+    help="Maximum number of services updated concurrently",
+    type=int,
+    default=default_parallelism,
+)
+def start_services(cluster, services, count, region, parallelism):
     """
     Start an AWS ECS service by updating its desiredCount to 0.
     """
     services = services.split(",")
-    start_services_func(cluster, services, count, region)
+    start_services_func(cluster, services, count, region, parallelism=parallelism)
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option(
     "--task-definition", "-t", help="ECS task definition name", type=str, required=True
@@ -228,7 +548,12 @@ def start_services(cluster, services, count, region):
 @click.option("--command", "-m", help="command to run", type=str, default=None)
 @click.option("--name", "-n", help="ECS task name", type=str, required=True)
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
 def run_task(cluster, task_definition, command, name, region):
     """
@@ -238,13 +563,14 @@ def run_task(cluster, task_definition, command, name, region):
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option(
     "--task-definition", "-t", help="ECS task definition name", type=str, required=True
@@ -266,28 +592,137 @@ def run_task(cluster, task_definition, command, name, region):
     default=600,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--container-logs",
+    help="Names of the containers whose logs are shown divided by comma (logs of all containers are shown by default)",
+    type=str,
+    default=None,
 )
 def run_task_and_wait_for_success(
-    cluster, task_definition, command, name, success_string, timeout, region
+    cluster,
+    task_definition,
+    command,
+    name,
+    success_string,
+    timeout,
+    region,
+    container_logs,
 ):
     """
     Run a single task in AWS ECS and wait for it to stop with success.
     """
     run_task_and_wait_for_success_func(
-        cluster, task_definition, command, name, success_string, timeout, region
+        cluster,
+        task_definition,
+        command,
+        name,
+        success_string,
+        timeout,
+        region,
+        container_logs=container_logs.split(",") if container_logs else None,
     )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
+    type=str,
+    default=default_clusters,
+    multiple=True,
+)
+@click.option(
+    "--task-definition", "-t", help="ECS task definition name", type=str, required=True
+)
+@click.option("--command", "-m", help="command to run", type=str, default=None)
+@click.option("--name", "-n", help="ECS task name", type=str, required=True)
+@click.option(
+    "--shards", "-s", help="Number of tasks (shards) to run", type=int, required=True
+)
+@click.option(
+    "--success-string",
+    help="String that is considered a success",
     type=str,
-    default=default_cluster,
+    default="0",
     required=True,
 )
+@click.option(
+    "--timeout",
+    "-o",
+    help="Seconds to wait before exiting with fail state",
+    type=int,
+    default=600,
+)
+@click.option(
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--container-logs",
+    help="Names of the containers whose logs are shown divided by comma (logs of all containers are shown by default)",
+    type=str,
+    default=None,
+)
+@click.option(
+    "--parallelism",
+    "-p",
+    help="Maximum number of tasks started concurrently",
+    type=int,
+    default=default_parallelism,
+)
+def run_tasks(
+    cluster,
+    task_definition,
+    command,
+    name,
+    shards,
+    success_string,
+    timeout,
+    region,
+    container_logs,
+    parallelism,
+):
+    """
+    Run the task in more shards in AWS ECS and wait for all of them to stop with success. Shard index and number of
+    shards are passed to the container in SHARD_INDEX and SHARD_COUNT environment variables.
+    """
+    run_tasks_func(
+        cluster,
+        task_definition,
+        command,
+        name,
+        shards,
+        success_string,
+        timeout,
+        region,
+        container_logs=container_logs.split(",") if container_logs else None,
+        parallelism=parallelism,
+    )
+
+
+@ecs.command()
+@for_each_target
+@click.option(
+    "--cluster",
+    "-c",
+    help="ECS cluster name (can be used more times)",
+    type=str,
+    default=default_clusters,
+    multiple=True,
+)
 @click.option("--service", "-s", help="ECS service name", type=str, required=True)
 @click.option("--command", "-m", help="command to run", type=str, required=True)
 @click.option(
@@ -312,27 +747,53 @@ def run_task_and_wait_for_success(
     default=None,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--container-logs",
+    help="Names of the containers whose logs are shown divided by comma (logs of all containers are shown by default)",
+    type=str,
+    default=None,
 )
 def run_service_task(
-    cluster, service, command, success_string, timeout, region, container
+    cluster,
+    service,
+    command,
+    success_string,
+    timeout,
+    region,
+    container,
+    container_logs,
 ):
     """
     Run a single task based on service's task definition in AWS ECS and wait for it to stop with success.
     """
     run_service_task_func(
-        cluster, service, command, success_string, timeout, region, container
+        cluster,
+        service,
+        command,
+        success_string,
+        timeout,
+        region,
+        container,
+        container_logs=container_logs.split(",") if container_logs else None,
     )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--service", "-s", help="ECS service name", type=str, required=True)
 @click.option("--command", "-m", help="command to run", type=str, required=True)
@@ -358,7 +819,12 @@ def run_service_task(
     default=None,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
 @click.option("--subnet", help="subnet ID", type=str, required=True, multiple=True)
 @click.option(
@@ -372,6 +838,12 @@ def run_service_task(
     required=False,
     default=None,
 )
+@click.option(
+    "--container-logs",
+    help="Names of the containers whose logs are shown divided by comma (logs of all containers are shown by default)",
+    type=str,
+    default=None,
+)
 def run_service_task_fargate(
     cluster,
     service,
@@ -383,6 +855,7 @@ def run_service_task_fargate(
     subnet,
     security_group,
     environment_file,
+    container_logs,
 ):
     """
     Run a single task based on service's task definition in AWS ECS and wait for it to stop with success.
@@ -404,57 +877,106 @@ def run_service_task_fargate(
         },
         launchType="FARGATE",
         environmentFiles=environment_file,
+        container_logs=container_logs.split(",") if container_logs else None,
     )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--service", "-s", help="ECS service name", type=str, required=True)
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--desired-status",
+    help="Desired status of the tasks",
+    type=click.Choice(["RUNNING", "PENDING", "STOPPED"]),
+    default="RUNNING",
+)
+@click.option("--family", help="Task definition family of the tasks", type=str)
+@click.option(
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
-def get_tasks_for_service(cluster, service, region):
+@click.option(
+    "--cached/--no-cached",
+    help="Answer from the local cluster snapshot (see the snapshot command), the snapshot is taken again when it is older than PYDEV_ECS_CACHE_TTL seconds (5 minutes by default)",
+    default=bool(default_cache_ttl),
+)
+def get_tasks_for_service(cluster, service, desired_status, family, region, cached):
     """
-    Return list of tasks running under specified service.
+    Return list of tasks running under specified service (one task ARN per line).
     """
-    click.echo(get_tasks_for_service_func(cluster, service, region))
+    if cached and desired_status == "RUNNING" and family is None:
+        # Snapshot contains only running tasks
+        tasks_arns = get_tasks_for_service_func(
+            cluster, service, region, cache_ttl=_get_cache_ttl(cached)
+        )
+    else:
+        tasks_arns = iter_tasks_arns_func(
+            cluster,
+            region,
+            service=service,
+            desired_status=desired_status,
+            family=family,
+        )
+    for task_arn in tasks_arns:
+        _echo(task_arn)
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--service", "-s", help="ECS service name", type=str, required=True)
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
-def get_task_definition_for_service(cluster, service, region):
+@click.option(
+    "--cached/--no-cached",
+    help="Answer from the local cluster snapshot (see the snapshot command), the snapshot is taken again when it is older than PYDEV_ECS_CACHE_TTL seconds (5 minutes by default)",
+    default=bool(default_cache_ttl),
+)
+def get_task_definition_for_service(cluster, service, region, cached):
     """
     Return task definition arn for specified service.
     """
-    click.echo(get_task_definition_for_service_func(cluster, service, region))
+    _echo(
+        get_task_definition_for_service_func(
+            cluster, service, region, cache_ttl=_get_cache_ttl(cached)
+        )
+    )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option("--service", "-s", help="ECS service name", type=str, required=True)
 @click.option(
@@ -465,7 +987,12 @@ def get_task_definition_for_service(cluster, service, region):
     default=600,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
 def stop_service_and_wait_for_tasks_to_stop(cluster, service, timeout, region):
     """
@@ -475,13 +1002,14 @@ def stop_service_and_wait_for_tasks_to_stop(cluster, service, timeout, region):
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option(
     "--services",
@@ -498,44 +1026,104 @@ def stop_service_and_wait_for_tasks_to_stop(cluster, service, timeout, region):
     default=600,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--parallelism",
+    "-p",
+    help="Maximum number of services updated concurrently",
+    type=int,
+    default=default_parallelism,
 )
-def stop_services_and_wait_for_tasks_to_stop(cluster, services, timeout, region):
+def stop_services_and_wait_for_tasks_to_stop(
+    cluster, services, timeout, region, parallelism
+):
     """
     Stop services and wait for the tasks to stop.
     """
     services = services.split(",")
-    stop_services_and_wait_for_tasks_to_stop_func(cluster, services, timeout, region)
+    stop_services_and_wait_for_tasks_to_stop_func(
+        cluster, services, timeout, region, parallelism=parallelism
+    )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--cached/--no-cached",
+    help="Answer from the local cluster snapshot (see the snapshot command), the snapshot is taken again when it is older than PYDEV_ECS_CACHE_TTL seconds (5 minutes by default)",
+    default=bool(default_cache_ttl),
 )
-def get_services_names(cluster, region):
+def get_services_names(cluster, region, cached):
     """
     Get names of the cluster services.
     """
-    for service_name in get_services_names_func(cluster, region):
-        click.echo(service_name)
+    if cached:
+        services_names = get_services_names_func(
+            cluster, region, cache_ttl=_get_cache_ttl(cached)
+        )
+    else:
+        services_names = iter_services_names_func(cluster, region)
+    for service_name in services_names:
+        _echo(service_name)
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
+)
+@click.option(
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+def snapshot(cluster, region):
+    """
+    Store snapshot of the cluster services, their task definitions, scaling targets and running tasks to the local
+    cache, it is used by read-only commands with --cached option.
+    """
+    take_snapshot_func(cluster, region)
+
+
+@ecs.command()
+@for_each_target
+@click.option(
+    "--cluster",
+    "-c",
+    help="ECS cluster name (can be used more times)",
+    type=str,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option(
     "--services",
@@ -545,49 +1133,163 @@ def get_services_names(cluster, region):
     required=True,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--parallelism",
+    "-p",
+    help="Maximum number of services updated concurrently",
+    type=int,
+    default=default_parallelism,
+)
+@click.option(
+    "--wait",
+    help="Wait until the services are stable and fail when the deployment fails",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--wait-timeout",
+    help="Seconds to wait for the services to be stable",
+    type=int,
+    default=600,
+)
+@click.option(
+    "--max-failed-tasks",
+    help="Number of failed tasks which fails the deployment (0 disables the check)",
+    type=int,
+    default=3,
 )
-def redeploy_services(cluster, services, region):
+def redeploy_services(
+    cluster, services, region, parallelism, wait, wait_timeout, max_failed_tasks
+):
     """
     Redeploy services by forcing new service deployment.
     """
     services = services.split(",")
-    redeploy_services_func(cluster, services, region)
+    services_cache = ServicesCache()
+    redeploy_services_func(
+        cluster,
+        services,
+        region,
+        parallelism=parallelism,
+        services_cache=services_cache,
+    )
+    if wait:
+        watch_rollout_func(
+            cluster,
+            services,
+            region,
+            timeout=wait_timeout,
+            max_failed_tasks=max_failed_tasks,
+            services_cache=services_cache,
+        )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
+)
+@click.option(
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
+)
+@click.option(
+    "--parallelism",
+    "-p",
+    help="Maximum number of services updated concurrently",
+    type=int,
+    default=default_parallelism,
+)
+@click.option(
+    "--wait",
+    help="Wait until the services are stable and fail when the deployment fails",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--wait-timeout",
+    help="Seconds to wait for the services to be stable",
+    type=int,
+    default=600,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--max-failed-tasks",
+    help="Number of failed tasks which fails the deployment (0 disables the check)",
+    type=int,
+    default=3,
 )
-def redeploy_cluster_services(cluster, region):
+def redeploy_cluster_services(
+    cluster, region, parallelism, wait, wait_timeout, max_failed_tasks
+):
     """
     Redeploy all cluster services by forcing new service deployment.
     """
-    redeploy_cluster_services_func(cluster, region)
+    services_cache = ServicesCache()
+    redeploy_cluster_services_func(
+        cluster, region, parallelism=parallelism, services_cache=services_cache
+    )
+    if wait:
+        wait_for_services_stable_func(
+            cluster,
+            region,
+            timeout=wait_timeout,
+            max_failed_tasks=max_failed_tasks,
+            services_cache=services_cache,
+        )
 
 
 @ecs.command()
+@for_each_target
 @click.option(
     "--cluster",
     "-c",
-    help="ECS cluster name",
+    help="ECS cluster name (can be used more times)",
     type=str,
-    default=default_cluster,
-    required=True,
+    default=default_clusters,
+    multiple=True,
 )
 @click.option(
-    "--region", "-r", help="AWS region", type=str, default=default_region, required=True
+    "--region",
+    "-r",
+    help="AWS region (can be used more times)",
+    type=str,
+    default=default_regions,
+    multiple=True,
 )
-def wait_for_services_stable(cluster, region):
+@click.option(
+    "--timeout",
+    "-o",
+    help="Seconds to wait before exiting with fail state",
+    type=int,
+    default=600,
+)
+@click.option(
+    "--max-failed-tasks",
+    help="Number of failed tasks which fails the deployment (0 disables the check, it is the default)",
+    type=int,
+    default=0,
+)
+def wait_for_services_stable(cluster, region, timeout, max_failed_tasks):
     """
-    Wait until all non-daemon services in cluster are stable.
+    Wait until all non-daemon services in cluster are stable. Changes of the services deployments are printed and
+    the command fails as soon as a deployment fails or --max-failed-tasks tasks of a deployment fail.
     """
-    wait_for_services_stable_func(cluster, region)
+    wait_for_services_stable_func(
+        cluster, region, timeout=timeout, max_failed_tasks=max_failed_tasks
+    )
@@ -0,0 +1,97 @@
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import click
+
+from developers_chamber.scripts import cli
+from developers_chamber.server import (
+    get_socket_path,
+    prepare_socket_dir,
+    send_control_request,
+    serve,
+)
+
+
+@cli.group()
+def server():
+    """Persistent pydev server which speeds up repeated pydev calls."""
+
+
+@server.command()
+@click.option(
+    "--foreground",
+    "-f",
+    help="Run the server in the current process",
+    is_flag=True,
+    default=False,
+)
+@click.option(
+    "--timeout",
+    "-o",
+    help="Seconds to wait for the server start",
+    type=int,
+    default=10,
+)
+def start(foreground, timeout):
+    """
+    Start pydev server. Commands are sent to the server with the "pydevc" client which accepts the same arguments as
+    the "pydev" command.
+    """
+    if send_control_request("status") is not None:
+        raise click.ClickException("Server is already running")
+
+    try:
+        prepare_socket_dir(get_socket_path())
+    except PermissionError as ex:
+        raise click.ClickException(ex)
+
+    if foreground:
+        serve()
+        return
+
+    subprocess.Popen(
+        [sys.executable, "-m", "developers_chamber.server", str(get_socket_path())],
+        cwd=Path.home(),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = send_control_request("status")
+        if status is not None:
+            click.echo("Server started (pid {})".format(status["pid"]))
+            return
+        time.sleep(0.1)
+    raise click.ClickException("Server was not started in {} seconds".format(timeout))
+
+
+@server.command()
+def stop():
+    """
+    Stop pydev server.
+    """
+    if send_control_request("stop") is None:
+        raise click.ClickException("Server is not running")
+    click.echo("Server stopped")
+
+
+@server.command()
+def status():
+    """
+    Print pydev server status.
+    """
+    status = send_control_request("status")
+    if status is None:
+        raise click.ClickException("Server is not running")
+    click.echo(
+        "Server is running (pid {}, socket {}, started {})".format(
+            status["pid"],
+            status["socket"],
+            datetime.fromtimestamp(status["started_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+    )
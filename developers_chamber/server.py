@@ -0,0 +1,392 @@
+"""
+Persistent pydev server which keeps an interpreter with imported dependencies warm.
+
+Every request is handled in a forked process which gets the client standard streams, environment variables and
+working directory, so concurrent invocations do not share any state. The module must import only the standard library
+at the module level because it is used by the thin client too.
+"""
+
+import importlib
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+HEADER_FORMAT = "!I"
+STANDARD_STREAMS = (0, 1, 2)
+
+# Dependencies of pydev and the optional extras which are imported by the server before any request is handled
+PRELOADED_MODULES = (
+    "click",
+    "click_completion",
+    "coloredlogs",
+    "dotenv",
+    "requests",
+    "toml",
+    "yaml",
+    "python_hosts",
+    "boto3",
+    "git",
+    "jira",
+    "unidecode",
+    "isort",
+    "toggl",
+    "slack_sdk",
+)
+PRELOADED_AWS_SERVICES = ("ecs", "logs", "application-autoscaling")
+
+# Requests are read by the server process, a client which does not send its request in time is disconnected
+REQUEST_TIMEOUT = 2
+# Minimal interval (in seconds) between checks of the pydev files changes
+WATCH_INTERVAL = 5
+
+
+def get_socket_path():
+    """
+    Returns path to the server socket, it can be changed with PYDEV_SERVER_SOCKET setting.
+    """
+    if os.environ.get("PYDEV_SERVER_SOCKET"):
+        return Path(os.environ["PYDEV_SERVER_SOCKET"])
+    return (
+        Path(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir())
+        / "pydev-{}".format(os.getuid())
+        / "server.sock"
+    )
+
+
+def _is_private_dir(path):
+    """
+    Returns True if the directory is owned by the user and accessible only for the user.
+    """
+    try:
+        path_stat = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(path_stat.st_mode)
+        and path_stat.st_uid == os.getuid()
+        and stat.S_IMODE(path_stat.st_mode) == 0o700
+    )
+
+
+def prepare_socket_dir(socket_path):
+    """
+    Creates directory of the server socket. PermissionError is raised if the directory is not owned by the user or it
+    is accessible by other users, because the server runs commands of everyone who can connect to the socket.
+    """
+    socket_dir = Path(socket_path).parent
+    socket_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not _is_private_dir(socket_dir):
+        raise PermissionError(
+            "Directory of the server socket must be owned by the user and accessible only for the user (mode 0700): "
+            "{}".format(socket_dir)
+        )
+
+
+def _send_message(conn, message):
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _send_request(conn, request, fds=()):
+    data = json.dumps(request).encode()
+    socket.send_fds(conn, [struct.pack(HEADER_FORMAT, len(data))], list(fds))
+    conn.sendall(data)
+
+
+def _recv_exactly(conn, size):
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed by the client")
+        data += chunk
+    return data
+
+
+def _recv_request(conn):
+    header, fds, _, _ = socket.recv_fds(
+        conn, struct.calcsize(HEADER_FORMAT), len(STANDARD_STREAMS)
+    )
+    (size,) = struct.unpack(HEADER_FORMAT, header)
+    return json.loads(_recv_exactly(conn, size)), fds
+
+
+def _connect(socket_path=None):
+    """
+    Returns connection to the server or None if the server is not running. Server is not used if its socket directory
+    or the server process does not belong to the user, environment and standard streams are never sent to it.
+    """
+    socket_path = Path(socket_path or get_socket_path())
+    if not _is_private_dir(socket_path.parent):
+        if os.path.lexists(socket_path.parent):
+            print(
+                "Server is not used, directory of its socket is not owned by the user or it is accessible by other "
+                "users: {}".format(socket_path.parent),
+                file=sys.stderr,
+            )
+        return None
+
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(socket_path))
+    except OSError:
+        conn.close()
+        return None
+
+    if not _check_peer(conn):
+        conn.close()
+        print(
+            "Server is not used, it is run by another user: {}".format(socket_path),
+            file=sys.stderr,
+        )
+        return None
+    return conn
+
+
+def send_control_request(command, socket_path=None):
+    """
+    Sends control command (status or stop) to the server and returns its response or None if server is not running.
+    """
+    conn = _connect(socket_path)
+    if conn is None:
+        return None
+    with conn:
+        _send_request(conn, {"control": command})
+        line = conn.makefile("rb").readline()
+    return json.loads(line) if line else None
+
+
+def run_client(argv):
+    """
+    Runs pydev command in the server and returns its exit code. The command is run in the current process if the
+    server is not running.
+    """
+    conn = _connect()
+    if conn is None:
+        sys.argv = sys.argv[:1] + argv
+        from developers_chamber.bin.pydev import cli
+
+        # Bootstrap of pydev may remove its own arguments from sys.argv
+        return cli.main(args=sys.argv[1:], prog_name="pydev")
+
+    with conn:
+        _send_request(
+            conn,
+            {"argv": argv, "env": dict(os.environ), "cwd": os.getcwd()},
+            fds=STANDARD_STREAMS,
+        )
+        responses = conn.makefile("rb")
+        line = responses.readline()
+        if not line:
+            return 1
+
+        # Signals are forwarded to the process which runs the command
+        pid = json.loads(line)["pid"]
+        for signum in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(signum, lambda signum, frame: os.kill(pid, signum))
+
+        line = responses.readline()
+        return json.loads(line)["exit_code"] if line else 1
+
+
+def _preload():
+    """
+    Imports modules and AWS service models which are shared by all requests. Returns botocore data loader with cached
+    service models or None if boto3 is not installed.
+    """
+    for module_name in PRELOADED_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+
+    if "boto3" not in sys.modules:
+        return None
+
+    import botocore.loaders
+    import botocore.session
+
+    data_loader = botocore.loaders.create_loader()
+    # A throwaway session with dummy credentials only fills the loader cache, credentials are never resolved here
+    botocore_session = botocore.session.Session()
+    botocore_session.register_component("data_loader", data_loader)
+    for service_name in PRELOADED_AWS_SERVICES:
+        botocore_session.create_client(
+            service_name,
+            region_name="us-east-1",
+            aws_access_key_id="preload",
+            aws_secret_access_key="preload",
+        )
+    return data_loader
+
+
+def _get_watched_files():
+    """
+    Returns modification times of files which restart the server if they are changed.
+    """
+    package_dir = Path(__file__).resolve().parent
+    watched_files = {}
+    for path in package_dir.rglob("*.py"):
+        watched_files[str(path)] = path.stat().st_mtime
+    return watched_files
+
+
+def _check_peer(conn):
+    """
+    Returns True if the other side of the connection is run by the user, it is used by both the server and the client.
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        # The socket directory is checked to be accessible only for the user
+        return True
+    credentials = conn.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid == os.getuid()
+
+
+def _run_command(conn, request, fds, data_loader):
+    """
+    Runs the pydev command in the forked process and exits the process with the command exit code.
+    """
+    exit_code = 1
+    try:
+        for fd, stream_fd in zip(STANDARD_STREAMS, fds):
+            os.dup2(stream_fd, fd)
+            os.close(stream_fd)
+        sys.stdout.reconfigure(line_buffering=sys.stdout.isatty())
+
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        sys.argv = ["pydev"] + request["argv"]
+
+        if data_loader is not None:
+            import boto3
+
+            # Credentials and configuration are resolved in the client environment
+            boto3.setup_default_session()
+            boto3.DEFAULT_SESSION._session.register_component(
+                "data_loader", data_loader
+            )
+
+        _send_message(conn, {"pid": os.getpid()})
+
+        # Server started with "pydev server start --foreground" has pydev already imported. Its modules are imported
+        # again, so configuration files, external scripts and aliases of the client are loaded to new command groups
+        for module_name in list(sys.modules):
+            if module_name in (
+                "developers_chamber.bin.pydev",
+                "developers_chamber.scripts",
+            ) or module_name.startswith("developers_chamber.scripts."):
+                del sys.modules[module_name]
+
+        from developers_chamber.bin.pydev import cli
+
+        cli.main(args=sys.argv[1:], prog_name="pydev")
+        exit_code = 0
+    except SystemExit as ex:
+        if ex.code is None or isinstance(ex.code, int):
+            exit_code = ex.code or 0
+        else:
+            print(ex.code, file=sys.stderr)
+    except KeyboardInterrupt:
+        exit_code = 130
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        try:
+            _send_message(conn, {"exit_code": exit_code})
+        except OSError:
+            pass
+        os._exit(exit_code)
+
+
+def serve(socket_path=None):
+    """
+    Runs the pydev server until it is stopped with the stop control request.
+    """
+    socket_path = Path(socket_path or get_socket_path())
+    prepare_socket_dir(socket_path)
+    if socket_path.exists():
+        socket_path.unlink()
+
+    data_loader = _preload()
+    watched_files = _get_watched_files()
+    started_at = time.time()
+    watched_at = time.monotonic()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    os.chmod(socket_path, 0o600)
+    server.listen(64)
+    # Finished requests processes are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+
+    while True:
+        conn, _ = server.accept()
+        with conn:
+            try:
+                if not _check_peer(conn):
+                    continue
+                conn.settimeout(REQUEST_TIMEOUT)
+                request, fds = _recv_request(conn)
+            except (OSError, ValueError):
+                continue
+
+            if request.get("control") == "status":
+                _send_message(
+                    conn,
+                    {
+                        "pid": os.getpid(),
+                        "started_at": started_at,
+                        "socket": str(socket_path),
+                    },
+                )
+                continue
+            elif request.get("control") == "stop":
+                _send_message(conn, {"pid": os.getpid()})
+                server.close()
+                socket_path.unlink()
+                return
+
+            if os.fork() == 0:
+                server.close()
+                conn.settimeout(None)
+                _run_command(conn, request, fds, data_loader)
+
+            for fd in fds:
+                os.close(fd)
+
+        # Files are not checked after every request, it would slow down bursts of requests
+        if time.monotonic() - watched_at < WATCH_INTERVAL:
+            continue
+        watched_at = time.monotonic()
+        if _get_watched_files() != watched_files:
+            # pydev was updated, the server is restarted to preload the new code
+            server.close()
+            socket_path.unlink()
+            os.execv(
+                sys.executable,
+                [sys.executable, "-m", "developers_chamber.server", str(socket_path)],
+            )
+
+
+if __name__ == "__main__":
+    serve(*sys.argv[1:])
@@ -6,6 +6,8 @@ from urllib.error import HTTPError
 import click
 from toggl.TogglPy import Endpoints, Toggl
 
+from developers_chamber.tracing import traced
+
 
 def _get_toggl_client(api_key):
     client = Toggl()
@@ -36,11 +38,13 @@ def _get_workspace(client, workspace_id, project_id):
         return client.getWorkspaces()[0]["id"]
 
 
+@traced("toggl")
 def check_workspace_and_project(api_key, workspace_id, project_id):
     client = _get_toggl_client(api_key)
     _get_workspace(client, workspace_id, project_id)
 
 
+@traced("toggl")
 def start_timer(api_key, description, workspace_id=None, project_id=None):
     client = _get_toggl_client(api_key)
     workspace_id = _get_workspace(client, workspace_id, project_id)
@@ -57,6 +61,7 @@ def start_timer(api_key, description, workspace_id=None, project_id=None):
     ]
 
 
+@traced("toggl")
 def stop_running_timer(api_key):
     client = _get_toggl_client(api_key)
     current_timer_data = get_running_timer_data(api_key)
@@ -66,6 +71,7 @@ def stop_running_timer(api_key):
         return None
 
 
+@traced("toggl")
 def get_running_timer_data(api_key):
     breakpoint()
     client = _get_toggl_client(api_key)
@@ -105,6 +111,7 @@ def _prepare_report_data(
     return data
 
 
+@traced("toggl")
 def get_timer_report(
     api_key,
     workspace_id=None,
@@ -120,6 +127,7 @@ def get_timer_report(
     return client.getDetailedReport(data)
 
 
+@traced("toggl")
 def get_full_timer_report(
     api_key,
     workspace_id=None,
@@ -0,0 +1,240 @@
+"""
+Tracing of pydev commands. Timed spans of commands, subprocesses, AWS API calls and HTTP requests are written in the
+Chrome trace event format (it can be loaded in chrome://tracing or Perfetto) to the file set in PYDEV_TRACE setting.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+TRACE_SETTING = "PYDEV_TRACE"
+# Set for pydev subprocesses, their spans are appended to the trace file of the parent process
+TRACE_PARENT_SETTING = "PYDEV_TRACE_PARENT"
+
+_tracer = None
+
+
+class Tracer:
+    def __init__(self, path):
+        self.path = path
+        self.events = []
+        self._lock = threading.Lock()
+
+    def add_span(self, name, category, start, end, args):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def write(self):
+        with self._lock:
+            events = list(self.events)
+        threads = {event["tid"] for event in events}
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {
+                    "name": "main" if tid == threading.main_thread().ident else str(tid)
+                },
+            }
+            for tid in threads
+        ]
+        # Spans of pydev subprocesses are written to the same file (perf_counter clock is shared by processes)
+        with open(self.path, "a+") as f:
+            try:
+                import fcntl
+            except ImportError:
+                # The file is not locked on Windows, spans of concurrent pydev subprocesses may be lost there
+                pass
+            else:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            content = f.read()
+            trace = (
+                json.loads(content)
+                if content
+                else {"traceEvents": [], "displayTimeUnit": "ms"}
+            )
+            trace["traceEvents"] += metadata + events
+            f.seek(0)
+            f.truncate()
+            json.dump(trace, f)
+
+
+def _get_command_name(ctx):
+    # Root command name depends on the way pydev was started (e.g. "python -m developers_chamber.bin.pydev")
+    names = []
+    while ctx.parent is not None:
+        names.insert(0, ctx.info_name)
+        ctx = ctx.parent
+    return " ".join(["pydev"] + names)
+
+
+@contextmanager
+def command_span(ctx):
+    """
+    Records invocation of the context command as a span if tracing is enabled.
+    """
+    import click
+
+    with span(
+        _get_command_name(ctx),
+        "command",
+        **({} if isinstance(ctx.command, click.Group) else {"params": ctx.params}),
+    ):
+        yield
+
+
+def _trace_click_commands():
+    """
+    Records invocation of every click command callback as a span. Commands without callback (e.g. alias commands)
+    record their span with command_span.
+    """
+    import click
+
+    invoke = click.Context.invoke
+
+    @wraps(invoke)
+    def traced_invoke(ctx, callback, /, *args, **kwargs):
+        # Context invokes callbacks of other commands too (ctx.invoke(other_command) or ctx.forward)
+        if callback is not ctx.command.callback:
+            return invoke(ctx, callback, *args, **kwargs)
+        with command_span(ctx):
+            return invoke(ctx, callback, *args, **kwargs)
+
+    click.Context.invoke = traced_invoke
+
+
+def enable_tracing():
+    """
+    Enables tracing if PYDEV_TRACE setting is set. The trace file is written when pydev exits.
+    """
+    global _tracer
+
+    path = os.environ.get(TRACE_SETTING)
+    if path and _tracer is None:
+        if os.environ.get(TRACE_PARENT_SETTING) is None:
+            os.environ[TRACE_PARENT_SETTING] = str(os.getpid())
+            if os.path.exists(path):
+                os.remove(path)
+        _tracer = Tracer(path)
+        _trace_click_commands()
+        atexit.register(_tracer.write)
+
+
+def _serialize_args(args):
+    return {
+        key: (
+            value
+            if isinstance(value, (str, int, float, bool, type(None)))
+            else repr(value)
+        )
+        for key, value in args.items()
+    }
+
+
+@contextmanager
+def span(name, category="pydev", **args):
+    """
+    Records the block as a timed span if tracing is enabled.
+    """
+    if _tracer is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as ex:
+        args["error"] = repr(ex)
+        raise
+    finally:
+        _tracer.add_span(
+            name, category, start, time.perf_counter(), _serialize_args(args)
+        )
+
+
+def traced(category):
+    """
+    Decorator which records every call of the function as a timed span.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span("{}.{}".format(category, func.__name__), category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_command(command):
+    """
+    Returns context manager recording a subprocess command span.
+    """
+    command_str = command if isinstance(command, str) else " ".join(command)
+    return span(command_str.split(" ", 1)[0], "subprocess", command=command_str)
+
+
+def trace_boto3_client(client):
+    """
+    Records all API calls of the boto3 client (including their retries) as timed spans.
+    """
+    if _tracer is None:
+        return client
+
+    service_name = client.meta.service_model.service_name
+
+    def call_started(model, context, **kwargs):
+        context["pydev_trace_start"] = time.perf_counter()
+
+    def call_finished(model, context, exception=None, **kwargs):
+        start = context.pop("pydev_trace_start", None)
+        if start is not None:
+            args = {"error": repr(exception)} if exception is not None else {}
+            _tracer.add_span(
+                "{}.{}".format(service_name, model.name),
+                "aws",
+                start,
+                time.perf_counter(),
+                args,
+            )
+
+    client.meta.events.register_first("before-parameter-build", call_started)
+    client.meta.events.register("after-call", call_finished)
+    client.meta.events.register("after-call-error", call_finished)
+    return client
+
+
+def trace_http_session(session):
+    """
+    Records all requests of the requests session as timed spans.
+    """
+    if _tracer is None:
+        return session
+
+    request = session.request
+
+    def traced_request(method, url, *args, **kwargs):
+        with span("{} {}".format(method.upper(), url), "http"):
+            return request(method, url, *args, **kwargs)
+
+    session.request = traced_request
+    return session
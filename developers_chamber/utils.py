@@ -3,9 +3,13 @@ import os
 import re
 import subprocess
 import sys
+from importlib.util import find_spec
+from pathlib import Path
 
 from click import ClickException
 
+from developers_chamber.tracing import trace_command, trace_http_session
+
 LOGGER = logging.getLogger()
 MIGRATIONS_PATTERN = r"migrations\/([^\/]+)\.py$"
 
@@ -15,12 +19,13 @@ def call_command(command, quiet=False, env=None):
     try:
         if not quiet:
             LOGGER.info(command if isinstance(command, str) else " ".join(command))
-        subprocess.check_call(
-            command,
-            stdout=sys.stdout,
-            shell=isinstance(command, str),
-            env=dict(os.environ, **env),
-        )
+        with trace_command(command):
+            subprocess.check_call(
+                command,
+                stdout=sys.stdout,
+                shell=isinstance(command, str),
+                env=dict(os.environ, **env),
+            )
     except subprocess.CalledProcessError:
         raise ClickException("Command returned error")
 
@@ -29,20 +34,21 @@ def call_compose_command(command, quiet=False, env=None):
     env = {} if env is None else env
     if not quiet:
         LOGGER.info(command if isinstance(command, str) else " ".join(command))
-    compose_process = subprocess.Popen(
-        command,
-        stdout=sys.stdout,
-        shell=isinstance(command, str),
-        env=dict(os.environ, **env),
-    )
-    try:
-        if compose_process.wait() != 0:
-            raise ClickException("Command returned error")
-    except KeyboardInterrupt:
+    with trace_command(command):
+        compose_process = subprocess.Popen(
+            command,
+            stdout=sys.stdout,
+            shell=isinstance(command, str),
+            env=dict(os.environ, **env),
+        )
         try:
-            compose_process.wait()
+            if compose_process.wait() != 0:
+                raise ClickException("Command returned error")
         except KeyboardInterrupt:
-            compose_process.wait()
+            try:
+                compose_process.wait()
+            except KeyboardInterrupt:
+                compose_process.wait()
 
 
 def pretty_time_delta(seconds):
@@ -57,6 +63,34 @@ def pretty_time_delta(seconds):
         return "{}s".format(seconds)
 
 
+_http_session = None
+
+
+def get_http_session():
+    """
+    Returns requests session shared by all commands run in the process, so the connections are reused.
+    """
+    global _http_session
+
+    if _http_session is None:
+        import requests
+
+        _http_session = trace_http_session(requests.Session())
+    return _http_session
+
+
+def get_cache_dir():
+    """
+    Returns pydev cache directory, it can be changed with PYDEV_CACHE_DIR setting.
+    """
+    cache_dir = Path(
+        os.environ.get("PYDEV_CACHE_DIR")
+        or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "pydev"
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
 def remove_ansi(input):
     """
     Remove non-visible characters (like color sequences etc.).
@@ -140,14 +174,12 @@ modules = {
     "toggle": ["toggl"],
     "slack": ["slack_sdk"],
     "bitbucket": ["git"],
+    "gitlab": ["git"],
 }
 
 INSTALLED_MODULES = []
 
+# Only look the requirements up, importing them would load e.g. boto3 on every pydev call
 for module, requirements in modules.items():
-    try:
-        for requirement in requirements:
-            __import__(requirement)
+    if all(find_spec(requirement) is not None for requirement in requirements):
         INSTALLED_MODULES.append(module)
-    except ModuleNotFoundError:
-        pass
@@ -55,6 +55,7 @@ setup(
     entry_points={
         "console_scripts": [
             "pydev=developers_chamber.bin.pydev:cli",
+            "pydevc=developers_chamber.bin.pydevc:main",
         ]
     },
     zip_safe=False,